@@ -0,0 +1,14 @@
+"""Benchmark and profiling suite for the lab assignments.
+
+Run from the repository root:
+
+    python -m benchmarks                      # sizes 1e3, 1e4, 1e5
+    python -m benchmarks --full               # 1e3 ... 1e7 (each case has its own cap)
+    python -m benchmarks --only 'lab2.*' --sizes 1e6
+    python -m benchmarks --compare old.json   # flag regressions against an earlier run
+    python -m benchmarks --profile profiles   # also dump cProfile stats per case
+
+Every case times one lab hot path on synthetic data (best of --repeat runs),
+then measures its tracemalloc peak in a separate run. Results are written as
+JSON, so runs can be compared with --compare.
+"""
@@ -0,0 +1,92 @@
+import argparse
+import fnmatch
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from .cases import CASES
+from .harness import compare, format_result, run_case, run_meta, write_results
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5]
+FULL_SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+# Larger inputs are timed once: a repeat would cost more than the noise it removes
+REPEAT_MAX_SIZE = 10**5
+
+
+def parse_sizes(text):
+    return [int(float(size)) for size in text.split(",") if size.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Benchmark and profile the lab hot paths on synthetic data.")
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES,
+                        help="comma-separated input sizes, e.g. 1e3,1e5 (default: 1e3,1e4,1e5)")
+    parser.add_argument("--full", action="store_true", help="sizes 1e3 to 1e7 (each case stops at its own cap)")
+    parser.add_argument("--only", action="append", metavar="PATTERN",
+                        help="run only cases matching this glob, e.g. 'weather.*' (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, best one kept (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--profile", metavar="DIR", help="also dump cProfile stats per case and size into DIR")
+    parser.add_argument("--out", metavar="PATH", help="results JSON (default: bench-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier results JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown / memory growth counted as a regression (default: 0.25)")
+    parser.add_argument("--data-dir", metavar="DIR", help="keep the generated inputs here instead of a temp dir")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CASES if not args.only or any(fnmatch.fnmatch(case.name, p) for p in args.only)]
+    if args.list:
+        for case in cases:
+            print(f"{case.name:<28} up to {case.max_size:,}")
+        return 0
+    if not cases:
+        parser.error("no case matches --only")
+
+    sizes = FULL_SIZES if args.full else args.sizes
+    out_path = args.out or f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    meta = run_meta(sizes, args.repeat)
+
+    results = []
+    failed = set()
+    with tempfile.TemporaryDirectory(prefix="lab-bench-") as tmp:
+        workdir = args.data_dir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        # Sizes outermost so the inputs of one size are generated once and shared
+        for n in sizes:
+            for case in cases:
+                if n > case.max_size or case.name in failed:
+                    continue
+                repeat = args.repeat if n <= REPEAT_MAX_SIZE else 1
+                try:
+                    result = run_case(case, n, workdir, repeat, not args.no_memory, args.profile)
+                except (ImportError, MemoryError, OSError) as e:
+                    # A missing optional dependency or too little memory: skip
+                    # the case's larger sizes too
+                    failed.add(case.name)
+                    result = {"case": case.name, "n": n, "error": f"{type(e).__name__}: {e}"}
+                results.append(result)
+                print(format_result(result), flush=True)
+
+    regressions = []
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        print(f"\nAgainst {args.compare}:")
+        for result in results:
+            if "change" in result:
+                print(format_result(result))
+
+    write_results(out_path, meta, results)
+    print(f"\nResults written to {out_path}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for name, n, kind in regressions:
+            print(f"  {name} n={n:,} ({kind})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Benchmark cases: one hot path of one lab each.
+
+A case's setup(n, workdir) builds its input outside the timed region and
+returns (run, ops, unit): run() is what gets timed, and it processes `ops`
+units per call, which gives the throughput.
+"""
+
+import os
+import shutil
+from collections import namedtuple
+from functools import lru_cache
+
+from . import generators
+from .labs import load_lab
+
+Case = namedtuple("Case", "name setup max_size")
+CASES = []
+
+# Lookups/queries per timed call for the cases whose cost is per query
+QUERIES = 1000
+
+
+def case(name, max_size=10**7):
+    def register(setup):
+        CASES.append(Case(name, setup, max_size))
+        return setup
+    return register
+
+
+def library(workdir):
+    # Lab 3 opens library.log in the working directory on import; keep that
+    # log with the generated data rather than wherever the suite was run
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return load_lab("lab3")
+    finally:
+        os.chdir(cwd)
+
+
+# Inputs are built once per size and shared by the cases that read them
+@lru_cache(maxsize=1)
+def books_file(n, workdir):
+    return generators.write_books_json(os.path.join(workdir, f"books-{n}.json"), n)
+
+
+@lru_cache(maxsize=1)
+def inventory(n, workdir):
+    # autosave off: the benchmark must never rewrite the file behind a case
+    return library(workdir).LibraryInventory(books_file(n, workdir), autosave=False)
+
+
+@lru_cache(maxsize=1)
+def marks(n):
+    return generators.marks(n)
+
+
+@lru_cache(maxsize=1)
+def weather_csv(n, workdir):
+    return generators.write_weather_csv(os.path.join(workdir, f"weather-{n}.csv"), n)
+
+
+@lru_cache(maxsize=1)
+def weather_data(n, workdir):
+    lab5 = load_lab("lab5")
+    raw = lab5.pd.read_csv(weather_csv(n, workdir))
+    return raw, lab5.clean_data(raw)
+
+
+# ----- Lab 3: library inventory -----
+@case("lab3.search_by_title", max_size=10**6)
+def search_by_title(n, workdir):
+    inv = inventory(n, workdir)
+    step = max(1, len(inv.books) // QUERIES)
+    # Whole titles and mid-title substrings, spread over the catalog
+    queries = [inv.books[i].title[2:12] if i % 2 else inv.books[i].title
+               for i in range(0, len(inv.books), step)][:QUERIES]
+    return lambda: [inv.search_by_title(q) for q in queries], len(queries), "queries"
+
+
+@case("lab3.search_by_isbn", max_size=10**6)
+def search_by_isbn(n, workdir):
+    inv = inventory(n, workdir)
+    isbns = [f"978{i * 7919 % n:010d}" for i in range(QUERIES)]
+    return lambda: [inv.search_by_isbn(isbn) for isbn in isbns], len(isbns), "queries"
+
+
+@case("lab3.save_books", max_size=10**6)
+def save_books(n, workdir):
+    inv = library(workdir).LibraryInventory(books_file(n, workdir), autosave=False)
+    inv.file_path = inv.file_path.with_name(f"saved-{n}.json")
+    return inv.save_books, n, "books"
+
+
+@case("lab3.load_books", max_size=10**6)
+def load_books(n, workdir):
+    return inventory(n, workdir).load_books, n, "books"
+
+
+# ----- Lab 2: grade book -----
+@case("lab2.statistics")
+def lab2_statistics(n, workdir):
+    lab2, data = load_lab("lab2"), marks(n)
+
+    def run():
+        lab2.calculate_average(data)
+        lab2.calculate_median(data)
+        lab2.find_max_score(data)
+        lab2.find_min_score(data)
+    return run, n, "students"
+
+
+@case("lab2.grading")
+def lab2_grading(n, workdir):
+    lab2, data = load_lab("lab2"), marks(n)
+
+    def run():
+        lab2.grade_distribution(lab2.assign_grades(data))
+        lab2.pass_fail_lists(data)
+    return run, n, "students"
+
+
+@case("lab2.analyze")
+def lab2_analyze(n, workdir):
+    lab2, data = load_lab("lab2"), marks(n)
+    return lambda: lab2.analyze(data, vectorized=False), n, "students"
+
+
+@case("lab2.analyze_vectorized")
+def lab2_analyze_vectorized(n, workdir):
+    lab2, data = load_lab("lab2"), marks(n)
+    if lab2.np is None:
+        raise ImportError("needs NumPy")
+    return lambda: lab2.analyze(data, vectorized=True), n, "students"
+
+
+@case("lab2.stream_csv")
+def lab2_stream_csv(n, workdir):
+    lab2 = load_lab("lab2")
+    path = generators.write_marks_csv(os.path.join(workdir, f"marks-{n}.csv"), n)
+    return lambda: lab2.stream_csv(path), n, "rows"
+
+
+# ----- Lab 5: weather pipeline, stage by stage -----
+@case("weather.load_cold")
+def weather_load_cold(n, workdir):
+    lab5, path = load_lab("lab5"), weather_csv(n, workdir)
+    cache_dir = os.path.join(workdir, "cache")
+
+    def run():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        lab5.load_clean_data(path, cache_dir)
+    return run, n, "rows"
+
+
+@case("weather.load_cached")
+def weather_load_cached(n, workdir):
+    lab5, path = load_lab("lab5"), weather_csv(n, workdir)
+    cache_dir = os.path.join(workdir, "cache")
+    lab5.load_clean_data(path, cache_dir)
+    # Touch every value: a warm load only memory-maps the columns
+    return lambda: lab5.load_clean_data(path, cache_dir).sum(numeric_only=True), n, "rows"
+
+
+@case("weather.clean")
+def weather_clean(n, workdir):
+    lab5, (raw, _) = load_lab("lab5"), weather_data(n, workdir)
+    return lambda: lab5.clean_data(raw), n, "rows"
+
+
+@case("weather.aggregate")
+def weather_aggregate(n, workdir):
+    lab5, (_, df) = load_lab("lab5"), weather_data(n, workdir)
+    return lambda: lab5.compute_stats(df), n, "rows"
+
+
+@case("weather.analytics")
+def weather_analytics(n, workdir):
+    lab5, (_, df) = load_lab("lab5"), weather_data(n, workdir)
+    return lambda: lab5.compute_analytics(df), n, "rows"
+
+
+@case("weather.plot")
+def weather_plot(n, workdir):
+    lab5, path = load_lab("lab5"), weather_csv(n, workdir)
+    cache_dir, output_dir = os.path.join(workdir, "cache"), os.path.join(workdir, "figures")
+    os.makedirs(output_dir, exist_ok=True)
+    monthly = lab5.compute_stats(lab5.load_clean_data(path, cache_dir))[1]
+    jobs = lab5.figure_jobs(path, monthly, cache_dir)
+    manifest = os.path.join(output_dir, "figures.json")
+
+    def run():
+        # Without the manifest every figure counts as changed and is redrawn
+        if os.path.exists(manifest):
+            os.remove(manifest)
+        lab5.render_figures(jobs, output_dir, workers=1)
+    return run, n, "rows"
+
+
+# ----- Lab 1: calorie tracker -----
+@case("lab1.bulk_report")
+def lab1_bulk_report(n, workdir):
+    lab1 = load_lab("lab1")
+    path = generators.write_meals_csv(os.path.join(workdir, f"meals-{n}.csv"), n)
+    out_path = os.path.join(workdir, "meals-report.txt")
+    return lambda: lab1.bulk_report(path, "csv", 2000, out_path), n, "meals"
+
+
+@case("lab1.food_lookup")
+def lab1_food_lookup(n, workdir):
+    lab1 = load_lab("lab1")
+    names = [generators.FOODS[i % len(generators.FOODS)].title() for i in range(n)]
+    db = lab1.FoodDatabase()
+    return lambda: [db.calories(name) for name in names], n, "lookups"
+
+
+@case("lab1.food_lookup_uncached")
+def lab1_food_lookup_uncached(n, workdir):
+    lab1 = load_lab("lab1")
+    names = [generators.FOODS[i % len(generators.FOODS)].title() for i in range(n)]
+    db = lab1.FoodDatabase(cache_size=0)
+    return lambda: [db.calories(name) for name in names], n, "lookups"
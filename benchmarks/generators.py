@@ -0,0 +1,77 @@
+"""Synthetic, reproducible inputs for the benchmark cases, at any size."""
+
+import csv
+import json
+import random
+
+WORDS = ["python", "data", "river", "silent", "garden", "quantum", "history", "modern",
+         "night", "ocean", "empire", "machine", "learning", "stone", "journey", "winter"]
+# All in lab 1's foods.csv except the last, which exercises lookup misses
+KNOWN_FOODS = ["toast", "banana", "rice", "dal", "chicken curry", "green salad", "pasta",
+               "oatmeal", "apple", "paneer tikka", "omelette", "yogurt"]
+FOODS = KNOWN_FOODS + ["coffee smoothie"]
+
+
+def book_dicts(n, seed=0):
+    # Lab 3 books: three-word titles (with repeats), ISBNs unique per book
+    rng = random.Random(seed)
+    return [{"title": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {rng.choice(WORDS)} {i % 997}",
+             "author": f"Author {rng.randrange(max(1, n // 10))}",
+             "isbn": f"978{i:010d}",
+             "status": "issued" if rng.random() < 0.1 else "available"}
+            for i in range(n)]
+
+
+def write_books_json(path, n, seed=0):
+    with open(path, "w") as f:
+        json.dump(book_dicts(n, seed), f)
+    return path
+
+
+def marks(n, seed=0):
+    # Lab 2 marks: {student: 0..100}
+    rng = random.Random(seed)
+    return {f"student{i}": rng.randint(0, 100) for i in range(n)}
+
+
+def write_marks_csv(path, n, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerows((f"student{i}", rng.randint(0, 100)) for i in range(n))
+    return path
+
+
+def weather_frame(n, seed=0):
+    # Weather rows every 15 minutes from 1900 (1e7 rows stay inside the
+    # datetime64[ns] range), with about 0.1% missing temperatures
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1900-01-01", periods=n, freq="15min")
+    seasonal = 10 * np.sin(2 * np.pi * dates.dayofyear.to_numpy() / 365.25)
+    temperature = (20 + seasonal + rng.normal(0, 3, n)).round(1)
+    temperature[rng.random(n) < 0.001] = np.nan
+    return pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d %H:%M"),
+        "Temperature": temperature,
+        "Rainfall": rng.exponential(3, n).round(1),
+        "Humidity": rng.integers(30, 91, n).astype(float),
+    })
+
+
+def write_weather_csv(path, n, seed=0):
+    weather_frame(n, seed).to_csv(path, index=False)
+    return path
+
+
+def write_meals_csv(path, n, seed=0):
+    # Lab 1 bulk input; every 20th meal leaves calories blank for the food list
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["meal", "calories"])
+        writer.writerows((rng.choice(KNOWN_FOODS), "" if i % 20 == 0 else rng.randint(50, 900))
+                         for i in range(n))
+    return path
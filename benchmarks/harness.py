@@ -0,0 +1,127 @@
+"""Timing, memory and profiling of one case, and baseline comparison."""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from .labs import ROOT
+
+RESULTS_VERSION = 1
+# Runs faster / peaks smaller than these are mostly noise and never count
+# as regressions
+MIN_COMPARABLE_SECONDS = 0.001
+MIN_COMPARABLE_BYTES = 1 << 20
+
+
+@contextlib.contextmanager
+def quiet():
+    # The labs report progress on stdout/stderr; keep it out of the table
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def run_case(case, n, workdir, repeat=3, memory=True, profile_dir=None):
+    with quiet():
+        run, ops, unit = case.setup(n, workdir)
+
+    times = []
+    for _ in range(repeat):
+        with quiet():
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    seconds = min(times)
+    result = {"case": case.name, "n": n, "seconds": seconds, "ops": ops, "unit": unit,
+              "throughput": ops / seconds if seconds else None}
+
+    # Separate runs: tracemalloc and cProfile both slow the code they watch
+    if memory:
+        tracemalloc.start()
+        try:
+            with quiet():
+                run()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{case.name}-{n}.prof")
+        profiler = cProfile.Profile()
+        with quiet():
+            profiler.runcall(run)
+        profiler.dump_stats(path)
+        result["profile"] = path
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_meta(sizes, repeat):
+    return {"version": RESULTS_VERSION, "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(), "python": sys.version.split()[0], "platform": platform.platform(),
+            "cpus": os.cpu_count(), "sizes": sizes, "repeat": repeat}
+
+
+def write_results(path, meta, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def compare(results, baseline_path, threshold):
+    # Annotates results in place with the change against the baseline run;
+    # returns the (case, n, what) of every regression beyond the threshold
+    with open(baseline_path) as f:
+        baseline = {(r["case"], r["n"]): r for r in json.load(f)["results"] if "seconds" in r}
+
+    regressions = []
+    for result in results:
+        before = baseline.get((result["case"], result["n"]))
+        if before is None or "seconds" not in result:
+            continue
+        result["baseline_seconds"] = before["seconds"]
+        result["change"] = result["seconds"] / before["seconds"] - 1
+        if result["change"] > threshold and max(result["seconds"], before["seconds"]) >= MIN_COMPARABLE_SECONDS:
+            result["regression"] = True
+            regressions.append((result["case"], result["n"], "time"))
+        if before.get("peak_bytes") and result.get("peak_bytes"):
+            result["baseline_peak_bytes"] = before["peak_bytes"]
+            if (result["peak_bytes"] > before["peak_bytes"] * (1 + threshold)
+                    and result["peak_bytes"] >= MIN_COMPARABLE_BYTES):
+                result["memory_regression"] = True
+                regressions.append((result["case"], result["n"], "memory"))
+    return regressions
+
+
+def format_result(result):
+    line = f"{result['case']:<28} {result['n']:>10,}"
+    if "error" in result:
+        return f"{line}  skipped: {result['error']}"
+    line += f" {result['seconds']:>10.4f}s"
+    if result["throughput"]:
+        line += f" {result['throughput']:>14,.0f} {result['unit']}/s"
+    if "peak_bytes" in result:
+        line += f" {result['peak_bytes'] / 2**20:>9.1f} MiB"
+    if "change" in result:
+        line += f" {result['change']:>+8.1%}"
+    if result.get("regression") or result.get("memory_regression"):
+        kinds = [kind for kind, key in (("time", "regression"), ("memory", "memory_regression")) if result.get(key)]
+        line += f"  REGRESSION ({', '.join(kinds)})"
+    return line
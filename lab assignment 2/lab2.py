@@ -6,8 +6,43 @@ Description: CLI tool for reading student marks, analysing statistics,
 assigning grades, and printing formatted reports.
 """
 
+import argparse
 import csv
+import glob
+import heapq
+import io
+import json
+import os
+import random
 import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # the vectorized grading path is optional
+    np = None
+
+# Rows handed to the streaming aggregator per read
+CHUNK_ROWS = 100_000
+
+# Lowest mark for each grade, best grade first; anything below gets FAIL_GRADE
+GRADE_BOUNDARIES = [(90, "A"), (80, "B"), (70, "C"), (60, "D")]
+FAIL_GRADE = "F"
+PASS_MARK = 40
+
+# Non-interactive reports: students listed per page unless --all, and
+# lines collected per write
+REPORT_PAGE_SIZE = 50
+REPORT_BATCH_LINES = 8192
+
+# Highest mark the incremental GradeBook accepts (marks run 0..MAX_MARK)
+MAX_MARK = 100
+
+# Cohorts at least this large are graded with NumPy when it is installed
+VECTORIZE_MIN_STUDENTS = 10_000
 
 # --------------------------------------------------------
 # Task 3 — Statistical Functions
@@ -32,26 +67,38 @@ def find_min_score(marks_dict):
 # Task 4 — Grade Assignment
 # --------------------------------------------------------
 
-def assign_grades(marks_dict):
+def ordered_boundaries(boundaries):
+    # Best grade first, whatever order the table was given in. Every grading
+    # entry point goes through here, so the Python and NumPy paths agree.
+    return sorted(boundaries, key=lambda boundary: boundary[0], reverse=True)
+
+
+def grade_for(score, boundaries=GRADE_BOUNDARIES):
+    # boundaries must be best grade first (see ordered_boundaries)
+    for min_score, grade in boundaries:
+        if score >= min_score:
+            return grade
+    return FAIL_GRADE
+
+
+def empty_distribution(boundaries=GRADE_BOUNDARIES):
+    counts = {grade: 0 for _, grade in boundaries}
+    counts[FAIL_GRADE] = 0
+    return counts
+
+
+def assign_grades(marks_dict, boundaries=GRADE_BOUNDARIES):
+    boundaries = ordered_boundaries(boundaries)
     grades = {}
 
     for name, score in marks_dict.items():
-        if score >= 90:
-            grades[name] = "A"
-        elif score >= 80:
-            grades[name] = "B"
-        elif score >= 70:
-            grades[name] = "C"
-        elif score >= 60:
-            grades[name] = "D"
-        else:
-            grades[name] = "F"
+        grades[name] = grade_for(score, boundaries)
 
     return grades
 
 
-def grade_distribution(grades_dict):
-    counts = {"A": 0, "B": 0, "C": 0, "D": 0, "F": 0}
+def grade_distribution(grades_dict, boundaries=GRADE_BOUNDARIES):
+    counts = empty_distribution(boundaries)
     for g in grades_dict.values():
         counts[g] += 1
     return counts
@@ -73,48 +120,651 @@ def manual_input():
     return marks
 
 
+def parse_row(row):
+    # Returns (name, score), or None for a row that cannot be used
+    if len(row) < 2 or not row[0]:
+        return None
+    try:
+        return row[0], int(row[1])
+    except ValueError:
+        return None
+
+
+def read_marks(file_path):
+    marks = {}
+    bad_rows = 0
+    with open(file_path, "r") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            parsed = parse_row(row)
+            if parsed is None:
+                bad_rows += 1
+                continue
+            name, score = parsed
+            marks[name] = score
+    return marks, bad_rows
+
+
 def load_csv():
     file_path = input("\nEnter CSV file path: ")
     marks = {}
 
     try:
-        with open(file_path, "r") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                name = row[0]
-                score = int(row[1])
-                marks[name] = score
+        marks, bad_rows = read_marks(file_path)
         print("CSV loaded successfully!")
+        if bad_rows:
+            print(f"Skipped {bad_rows} invalid row(s).")
     except Exception as e:
         print("Error loading CSV:", e)
 
     return marks
 
 
+# --------------------------------------------------------
+# Streaming CSV Analysis (files too large for a dict)
+# --------------------------------------------------------
+
+class RunningStats:
+    """Aggregates kept while streaming rows; no student names are stored.
+
+    Every valid row counts, so a name that appears twice is counted twice
+    (the dict-based loaders keep only the last mark for a name).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max_name, self.max_score = None, None
+        self.min_name, self.min_score = None, None
+        self.score_counts = {}
+        self.grade_counts = empty_distribution()
+        self.passed = 0
+        self.failed = 0
+        self.bad_rows = 0
+
+    def add(self, name, score):
+        self.count += 1
+        self.total += score
+        # Strict comparisons keep the first student seen, like max()/min()
+        if self.max_score is None or score > self.max_score:
+            self.max_name, self.max_score = name, score
+        if self.min_score is None or score < self.min_score:
+            self.min_name, self.min_score = name, score
+        self.score_counts[score] = self.score_counts.get(score, 0) + 1
+        self.grade_counts[grade_for(score)] += 1
+        if score >= PASS_MARK:
+            self.passed += 1
+        else:
+            self.failed += 1
+
+    def average(self):
+        return self.total / self.count
+
+    def median(self):
+        return histogram_median(self.score_counts, self.count)
+
+    def merge(self, other):
+        # Fold in another file's summary; on ties the earlier summary keeps
+        # its student, as if the files had been read one after another
+        self.count += other.count
+        self.total += other.total
+        if other.max_score is not None and (self.max_score is None or other.max_score > self.max_score):
+            self.max_name, self.max_score = other.max_name, other.max_score
+        if other.min_score is not None and (self.min_score is None or other.min_score < self.min_score):
+            self.min_name, self.min_score = other.min_name, other.min_score
+        for score, n in other.score_counts.items():
+            self.score_counts[score] = self.score_counts.get(score, 0) + n
+        for grade, n in other.grade_counts.items():
+            self.grade_counts[grade] = self.grade_counts.get(grade, 0) + n
+        self.passed += other.passed
+        self.failed += other.failed
+        self.bad_rows += other.bad_rows
+        return self
+
+
+def read_csv_chunks(file_path, chunk_rows=CHUNK_ROWS):
+    with open(file_path, "r", newline="") as f:
+        reader = csv.reader(f)
+        while True:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                return
+            yield chunk
+
+
+def stream_csv(file_path, chunk_rows=CHUNK_ROWS):
+    stats = RunningStats()
+    for chunk in read_csv_chunks(file_path, chunk_rows):
+        for row in chunk:
+            parsed = parse_row(row)
+            if parsed is None:
+                stats.bad_rows += 1
+            else:
+                stats.add(*parsed)
+    return stats
+
+
+def print_stream_summary(stats):
+    print("\n===== STREAMED ANALYSIS SUMMARY =====")
+    print(f"Students: {stats.count}  (skipped {stats.bad_rows} invalid row(s))")
+    print(f"Average Score: {stats.average():.2f}")
+    print(f"Median Score: {stats.median()}")
+    print(f"Highest Score: {stats.max_name} ({stats.max_score})")
+    print(f"Lowest Score:  {stats.min_name} ({stats.min_score})")
+
+    print("\nGrade Distribution:")
+    for g, c in stats.grade_counts.items():
+        print(f"{g}: {c}")
+
+    print(f"\nPassed: {stats.passed}  Failed: {stats.failed}")
+
+
 # --------------------------------------------------------
 # Task 6 — Output Table
 # --------------------------------------------------------
 
-def print_results_table(marks, grades):
-    print("\nName\t\tMarks\tGrade")
-    print("--------------------------------------")
+def table_lines(rows):
+    # rows: (name, mark, grade)
+    yield "\nName\t\tMarks\tGrade\n"
+    yield "--------------------------------------\n"
+    for name, mark, grade in rows:
+        yield f"{name:12}\t{mark}\t{grade}\n"
+    yield "--------------------------------------\n\n"
 
-    for name in marks:
-        print(f"{name:12}\t{marks[name]}\t{grades[name]}")
 
-    print("--------------------------------------\n")
+def write_lines(lines, out=None, batch_lines=REPORT_BATCH_LINES):
+    # One write per batch of lines instead of one print per line
+    out = out or sys.stdout
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_lines:
+            out.write("".join(batch))
+            batch.clear()
+    out.write("".join(batch))
+
+
+def print_results_table(marks, grades):
+    write_lines(table_lines((name, marks[name], grades[name]) for name in marks))
 
 
 # --------------------------------------------------------
 # Task 5 – Pass/Fail using list comprehension
 # --------------------------------------------------------
 
-def pass_fail_lists(marks_dict):
-    passed = [name for name, m in marks_dict.items() if m >= 40]
-    failed = [name for name, m in marks_dict.items() if m < 40]
+def pass_fail_lists(marks_dict, pass_mark=PASS_MARK):
+    passed = [name for name, m in marks_dict.items() if m >= pass_mark]
+    failed = [name for name, m in marks_dict.items() if m < pass_mark]
     return passed, failed
 
 
+# --------------------------------------------------------
+# Fused single-pass analysis
+# --------------------------------------------------------
+
+def histogram_median(score_counts, count):
+    # Exact median from a mark histogram, same result as statistics.median,
+    # in O(distinct marks) instead of sorting every mark
+    lower_rank, upper_rank = (count - 1) // 2, count // 2
+    seen = 0
+    lower = None
+    for score in sorted(score_counts):
+        seen += score_counts[score]
+        if lower is None and seen > lower_rank:
+            lower = score
+        if seen > upper_rank:
+            return lower if lower_rank == upper_rank else (lower + score) / 2
+
+
+class GradeBookAnalysis:
+    # Everything main() reports, computed by analyze() in one pass
+    def __init__(self, average, median, max_name, max_score, min_name, min_score,
+                 grades, distribution, passed, failed):
+        self.average = average
+        self.median = median
+        self.max_name, self.max_score = max_name, max_score
+        self.min_name, self.min_score = min_name, min_score
+        self.grades = grades
+        self.distribution = distribution
+        self.passed = passed
+        self.failed = failed
+
+
+def analyze(marks_dict, boundaries=GRADE_BOUNDARIES, pass_mark=PASS_MARK, vectorized=None):
+    # vectorized=None picks NumPy for large cohorts when it is installed
+    boundaries = ordered_boundaries(boundaries)
+    if vectorized is None:
+        vectorized = np is not None and len(marks_dict) >= VECTORIZE_MIN_STUDENTS
+    if vectorized:
+        return VectorGradeBook(marks_dict, boundaries, pass_mark).analysis()
+
+    grades = {}
+    distribution = empty_distribution(boundaries)
+    score_counts = {}
+    grade_cache = {}
+    passed, failed = [], []
+    total = 0
+    max_name = min_name = None
+    max_score = min_score = None
+
+    for name, score in marks_dict.items():
+        total += score
+        if max_score is None or score > max_score:
+            max_name, max_score = name, score
+        if min_score is None or score < min_score:
+            min_name, min_score = name, score
+        score_counts[score] = score_counts.get(score, 0) + 1
+
+        grade = grade_cache.get(score)
+        if grade is None:
+            grade = grade_cache[score] = grade_for(score, boundaries)
+        grades[name] = grade
+        distribution[grade] += 1
+
+        if score >= pass_mark:
+            passed.append(name)
+        else:
+            failed.append(name)
+
+    count = len(marks_dict)
+    return GradeBookAnalysis(total / count, histogram_median(score_counts, count),
+                             max_name, max_score, min_name, min_score,
+                             grades, distribution, passed, failed)
+
+
+# --------------------------------------------------------
+# Vectorized grading (NumPy)
+# --------------------------------------------------------
+
+class VectorGradeBook:
+    # Marks held in one NumPy array; grades come from a searchsorted lookup
+    # against the boundary table instead of a per-student if/elif ladder
+    def __init__(self, marks_dict, boundaries=GRADE_BOUNDARIES, pass_mark=PASS_MARK):
+        if np is None:
+            raise ImportError("VectorGradeBook needs NumPy: pip install numpy")
+        self.names = np.array(list(marks_dict), dtype=object)
+        self.marks = np.asarray(list(marks_dict.values()))
+        # Ascending for searchsorted; reversed rather than re-sorted so ties
+        # resolve to the same grade as grade_for
+        ordered = ordered_boundaries(boundaries)[::-1]
+        self.thresholds = np.array([min_score for min_score, _ in ordered])
+        self.letters = np.array([FAIL_GRADE] + [grade for _, grade in ordered], dtype=object)
+        self.boundaries = ordered[::-1]
+        self.pass_mark = pass_mark
+        self._grade_index = None
+
+    def grade_index(self):
+        # Position in self.letters for every student
+        if self._grade_index is None:
+            self._grade_index = np.searchsorted(self.thresholds, self.marks, side="right")
+        return self._grade_index
+
+    def grades_dict(self):
+        return dict(zip(self.names.tolist(), self.letters[self.grade_index()].tolist()))
+
+    def distribution(self):
+        counts = np.bincount(self.grade_index(), minlength=len(self.letters)).tolist()
+        by_letter = dict(zip(self.letters.tolist(), counts))
+        return {grade: by_letter[grade] for grade in empty_distribution(self.boundaries)}
+
+    def pass_mask(self):
+        return self.marks >= self.pass_mark
+
+    def pass_fail_lists(self):
+        mask = self.pass_mask()
+        return self.names[mask].tolist(), self.names[~mask].tolist()
+
+    def average(self):
+        return float(self.marks.mean())
+
+    def median(self):
+        # Two O(n) selections; same value and type as statistics.median
+        n = len(self.marks)
+        lower_rank, upper_rank = (n - 1) // 2, n // 2
+        selected = np.partition(self.marks, [lower_rank, upper_rank])
+        lower, upper = selected[lower_rank].item(), selected[upper_rank].item()
+        return lower if n % 2 else (lower + upper) / 2
+
+    def analysis(self):
+        # argmax/argmin return the first student, like max()/min() on the dict
+        top, bottom = int(self.marks.argmax()), int(self.marks.argmin())
+        passed, failed = self.pass_fail_lists()
+        return GradeBookAnalysis(self.average(), self.median(),
+                                 self.names[top], self.marks[top].item(),
+                                 self.names[bottom], self.marks[bottom].item(),
+                                 self.grades_dict(), self.distribution(), passed, failed)
+
+
+def benchmark(n=10_000_000):
+    # Fused analyze() against the separate Task 3-5 functions on n students
+    rng = random.Random(42)
+    marks = {f"student{i}": rng.randint(0, 100) for i in range(n)}
+
+    start = time.perf_counter()
+    calculate_average(marks)
+    calculate_median(marks)
+    find_max_score(marks)
+    find_min_score(marks)
+    grade_distribution(assign_grades(marks))
+    pass_fail_lists(marks)
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyze(marks, vectorized=False)
+    fused = time.perf_counter() - start
+
+    print(f"{n:,} students")
+    print(f"Separate passes: {separate:.2f}s")
+    print(f"Fused analyze(): {fused:.2f}s  ({separate / fused:.1f}x faster)")
+
+    if np is None:
+        print("NumPy not installed, skipping the vectorized path.")
+        return
+    start = time.perf_counter()
+    book = VectorGradeBook(marks)
+    book.distribution()
+    book.pass_mask()
+    arrays_only = time.perf_counter() - start
+    start = time.perf_counter()
+    analyze(marks, vectorized=True)
+    vectorized = time.perf_counter() - start
+    print(f"NumPy grading (arrays only): {arrays_only:.2f}s  ({separate / arrays_only:.1f}x faster)")
+    print(f"NumPy analysis() with dicts: {vectorized:.2f}s  ({separate / vectorized:.1f}x faster)")
+
+
+# --------------------------------------------------------
+# Batch Analysis of Many CSV Files (multi-process)
+# --------------------------------------------------------
+
+def find_csv_files(path_or_glob):
+    if os.path.isdir(path_or_glob):
+        return sorted(glob.glob(os.path.join(path_or_glob, "*.csv")))
+    return sorted(glob.glob(path_or_glob))
+
+
+def summarize_file(file_path):
+    # Runs in a worker process; only the compact summary travels back. An
+    # unreadable, undecodable or malformed file is reported, not raised, so
+    # it cannot abort the batch. UnicodeDecodeError is a ValueError.
+    try:
+        return file_path, stream_csv(file_path), None
+    except (OSError, ValueError, csv.Error) as e:
+        return file_path, None, str(e)
+
+
+def analyze_files(file_paths, workers=None):
+    merged = RunningStats()
+    per_file = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for file_path, stats, error in pool.map(summarize_file, file_paths):
+            per_file.append((file_path, stats, error))
+            if stats is not None:
+                merged.merge(stats)
+    return per_file, merged
+
+
+def print_batch_report(per_file, merged, show_files=False):
+    if show_files:
+        print("\nFile\t\t\t\tStudents\tAverage\tMedian\tPassed\tFailed")
+        print("----------------------------------------------------------------------")
+        for file_path, stats, error in per_file:
+            if error:
+                print(f"{file_path:24}\tERROR: {error}")
+            elif not stats.count:
+                print(f"{file_path:24}\t0\t-\t-\t0\t0")
+            else:
+                print(f"{file_path:24}\t{stats.count}\t{stats.average():.2f}\t"
+                      f"{stats.median()}\t{stats.passed}\t{stats.failed}")
+
+    failed_files = sum(1 for _, _, error in per_file if error)
+    print(f"\nAnalysed {len(per_file) - failed_files} of {len(per_file)} file(s).")
+    if merged.count:
+        print_stream_summary(merged)
+    else:
+        print("No data found.")
+
+
+# --------------------------------------------------------
+# Incremental GradeBook (live mark entry)
+# --------------------------------------------------------
+
+class GradeBook:
+    """Marks that can be added, corrected or removed one at a time.
+
+    Aggregates are updated on every change instead of being recomputed:
+    a Fenwick tree over the mark range answers median/min/max in
+    O(log MAX_MARK), and per-mark heaps give the first student holding a
+    mark, matching max()/min() on the marks dict.
+    """
+
+    def __init__(self, max_mark=MAX_MARK, boundaries=GRADE_BOUNDARIES, pass_mark=PASS_MARK):
+        self.max_mark = max_mark
+        self.boundaries = ordered_boundaries(boundaries)
+        self.pass_mark = pass_mark
+        self.marks = {}
+        self.total = 0
+        self.passed = 0
+        self.grade_counts = empty_distribution(self.boundaries)
+        self._tree = [0] * (max_mark + 2)   # Fenwick tree, mark m at index m + 1
+        self._order = {}                    # name -> position in dict order
+        self._next_order = 0
+        self._by_score = {}                 # mark -> heap of (order, name), stale entries skipped lazily
+
+    def _tree_add(self, score, delta):
+        i = score + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _kth_score(self, k):
+        # Smallest mark with at least k marks at or below it
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+    def _count(self, score, delta):
+        self.total += delta * score
+        self._tree_add(score, delta)
+        self.grade_counts[grade_for(score, self.boundaries)] += delta
+        if score >= self.pass_mark:
+            self.passed += delta
+
+    def set_mark(self, name, score):
+        # Same overwrite rule as marks[name] = score: a correction keeps the
+        # student's original position
+        if not isinstance(score, int) or not 0 <= score <= self.max_mark:
+            raise ValueError(f"Mark must be a whole number from 0 to {self.max_mark}: {score!r}")
+        if name in self.marks:
+            self._count(self.marks[name], -1)
+        else:
+            self._order[name] = self._next_order
+            self._next_order += 1
+        self.marks[name] = score
+        self._count(score, 1)
+        heapq.heappush(self._by_score.setdefault(score, []), (self._order[name], name))
+
+    def remove_mark(self, name):
+        score = self.marks.pop(name)
+        del self._order[name]
+        self._count(score, -1)
+
+    def _first_student(self, score):
+        heap = self._by_score[score]
+        while True:
+            order, name = heap[0]
+            if self.marks.get(name) == score and self._order.get(name) == order:
+                return name
+            heapq.heappop(heap)
+
+    def count(self):
+        return len(self.marks)
+
+    def failed(self):
+        return len(self.marks) - self.passed
+
+    def average(self):
+        return self.total / len(self.marks)
+
+    def median(self):
+        n = len(self.marks)
+        lower = self._kth_score((n - 1) // 2 + 1)
+        upper = self._kth_score(n // 2 + 1)
+        return lower if n % 2 else (lower + upper) / 2
+
+    def highest(self):
+        score = self._kth_score(len(self.marks))
+        return self._first_student(score), score
+
+    def lowest(self):
+        score = self._kth_score(1)
+        return self._first_student(score), score
+
+
+def live_entry():
+    book = GradeBook()
+    print("\nEnter marks as 'name,mark' (repeat a name to correct it),")
+    print("'-name' to remove a student, or an empty line to finish.")
+
+    while True:
+        line = input("> ").strip()
+        if not line:
+            return book
+        try:
+            if line.startswith("-"):
+                book.remove_mark(line[1:].strip())
+            else:
+                name, mark = line.rsplit(",", 1)
+                book.set_mark(name.strip(), int(mark))
+        except KeyError:
+            print("No such student.")
+            continue
+        except ValueError as e:
+            print("Invalid entry:", e)
+            continue
+
+        if not book.count():
+            print("No marks entered yet.")
+            continue
+        top_name, top = book.highest()
+        low_name, low = book.lowest()
+        print(f"Students: {book.count()}  Average: {book.average():.2f}  Median: {book.median()}  "
+              f"Highest: {top_name} ({top})  Lowest: {low_name} ({low})  "
+              f"Passed: {book.passed}  Failed: {book.failed()}")
+
+
+# --------------------------------------------------------
+# Non-interactive Reports (--input ... --format ... --out ...)
+# --------------------------------------------------------
+
+def select_students(marks, top=None, bottom=None, page=1, page_size=REPORT_PAGE_SIZE, show_all=False):
+    # (name, mark) pairs to render; the default is one page, never the whole cohort
+    if top:
+        return heapq.nlargest(top, marks.items(), key=lambda item: item[1])
+    if bottom:
+        return heapq.nsmallest(bottom, marks.items(), key=lambda item: item[1])
+    if show_all:
+        return marks.items()
+    start = (page - 1) * page_size
+    return list(islice(marks.items(), start, start + page_size))
+
+
+def summary_dict(result, count):
+    return {
+        "students": count,
+        "average": round(result.average, 2),
+        "median": result.median,
+        "highest": {"name": result.max_name, "mark": result.max_score},
+        "lowest": {"name": result.min_name, "mark": result.min_score},
+        "distribution": result.distribution,
+        "passed": len(result.passed),
+        "failed": len(result.failed),
+    }
+
+
+def report_table(summary, rows, note):
+    yield "===== ANALYSIS SUMMARY =====\n"
+    yield f"Students: {summary['students']}\n"
+    yield f"Average Score: {summary['average']:.2f}\n"
+    yield f"Median Score: {summary['median']}\n"
+    yield f"Highest Score: {summary['highest']['name']} ({summary['highest']['mark']})\n"
+    yield f"Lowest Score:  {summary['lowest']['name']} ({summary['lowest']['mark']})\n"
+    yield "\nGrade Distribution:\n"
+    for g, c in summary["distribution"].items():
+        yield f"{g}: {c}\n"
+    yield f"\nPassed: {summary['passed']}  Failed: {summary['failed']}\n"
+    yield from table_lines(rows)
+    if note:
+        yield note + "\n"
+
+
+def report_csv(summary, rows, note):
+    yield "name,mark,grade\n"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    while True:
+        batch = list(islice(rows, REPORT_BATCH_LINES))
+        if not batch:
+            return
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def report_json(summary, rows, note):
+    yield '{"summary": ' + json.dumps(summary) + ', "students": ['
+    separator = ""
+    for name, mark, grade in rows:
+        yield separator + json.dumps({"name": name, "mark": mark, "grade": grade})
+        separator = ", "
+    yield "]}\n"
+
+
+REPORT_FORMATS = {"table": report_table, "csv": report_csv, "json": report_json}
+
+
+def write_report(input_path, fmt="table", out_path=None, top=None, bottom=None,
+                 page=1, page_size=REPORT_PAGE_SIZE, show_all=False):
+    marks, bad_rows = read_marks(input_path)
+    if not marks:
+        print(f"No data found in {input_path}.", file=sys.stderr)
+        return False
+    paged = not (top or bottom or show_all)
+    pages = -(-len(marks) // page_size)
+    if paged and page > pages:
+        print(f"Page {page} is past the end: {len(marks)} student(s) make {pages} page(s) "
+              f"of {page_size}.", file=sys.stderr)
+        return False
+    result = analyze(marks)
+    selected = select_students(marks, top, bottom, page, page_size, show_all)
+    rows = ((name, mark, result.grades[name]) for name, mark in selected)
+
+    note = None
+    if paged and len(marks) > page_size:
+        first = (page - 1) * page_size + 1
+        note = (f"Showing students {first}-{min(first + page_size - 1, len(marks))} of {len(marks)}; "
+                f"use --page, --top/--bottom or --all for more.")
+    if bad_rows:
+        print(f"Skipped {bad_rows} invalid row(s).", file=sys.stderr)
+    if note and fmt != "table":
+        # Keep csv/json output machine-readable
+        print(note, file=sys.stderr)
+
+    lines = REPORT_FORMATS[fmt](summary_dict(result, len(marks)), rows, note)
+    if out_path:
+        with open(out_path, "w", newline="", buffering=1 << 20) as out:
+            write_lines(lines, out)
+    else:
+        write_lines(lines)
+    return True
+
+
 # --------------------------------------------------------
 # CLI LOOP (Task 1 + Task 6)
 # --------------------------------------------------------
@@ -127,7 +777,9 @@ def main():
         print("\nChoose input method:")
         print("1. Manual data entry")
         print("2. Load CSV file")
-        print("3. Exit")
+        print("3. Stream large CSV file (summary only)")
+        print("4. Live mark entry")
+        print("5. Exit")
 
         choice = input("Enter choice: ")
 
@@ -136,6 +788,20 @@ def main():
         elif choice == "2":
             marks = load_csv()
         elif choice == "3":
+            file_path = input("\nEnter CSV file path: ")
+            try:
+                stats = stream_csv(file_path)
+            except (OSError, ValueError, csv.Error) as e:
+                print("Error loading CSV:", e)
+                continue
+            if not stats.count:
+                print("No data found. Try again.")
+                continue
+            print_stream_summary(stats)
+            continue
+        elif choice == "4":
+            marks = live_entry().marks
+        elif choice == "5":
             print("Goodbye!")
             break
         else:
@@ -146,35 +812,25 @@ def main():
             print("No data found. Try again.")
             continue
 
-        # Statistical analysis
-        avg = calculate_average(marks)
-        med = calculate_median(marks)
-        max_name, max_score = find_max_score(marks)
-        min_name, min_score = find_min_score(marks)
-
-        # Grade assignment
-        grades = assign_grades(marks)
-        dist = grade_distribution(grades)
-
-        # Pass/Fail
-        passed, failed = pass_fail_lists(marks)
+        # Statistics, grades and pass/fail in a single pass
+        result = analyze(marks)
 
         # Print summary
         print("\n===== ANALYSIS SUMMARY =====")
-        print(f"Average Score: {avg:.2f}")
-        print(f"Median Score: {med}")
-        print(f"Highest Score: {max_name} ({max_score})")
-        print(f"Lowest Score:  {min_name} ({min_score})")
+        print(f"Average Score: {result.average:.2f}")
+        print(f"Median Score: {result.median}")
+        print(f"Highest Score: {result.max_name} ({result.max_score})")
+        print(f"Lowest Score:  {result.min_name} ({result.min_score})")
 
         print("\nGrade Distribution:")
-        for g, c in dist.items():
+        for g, c in result.distribution.items():
             print(f"{g}: {c}")
 
-        print("\nPassed Students:", passed)
-        print("Failed Students:", failed)
+        print("\nPassed Students:", result.passed)
+        print("Failed Students:", result.failed)
 
         # Print formatted table
-        print_results_table(marks, grades)
+        print_results_table(marks, result.grades)
 
         # Repeat?
         again = input("Run analysis again? (y/n): ").lower()
@@ -183,14 +839,48 @@ def main():
             break
 
 
-# Run program
-if __name__ == "__main__":
-    main()
-
-import csv
- def read_csv().
-    with open ("CSV FILE.PY")
-
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return value
 
 
- 
\ No newline at end of file
+# Run program
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GradeBook Analyzer")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="time the fused analysis against the separate functions on N students")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB",
+                        help="analyse every CSV in a directory (or matching a glob) in parallel")
+    parser.add_argument("--workers", type=int, help="worker processes for --batch (default: all cores)")
+    parser.add_argument("--per-file", action="store_true", help="also print one line per file in --batch")
+    parser.add_argument("--input", metavar="CSV", help="analyse this file without prompting")
+    parser.add_argument("--format", choices=sorted(REPORT_FORMATS), default="table",
+                        help="report format for --input (default: table)")
+    parser.add_argument("--out", metavar="PATH", help="write the --input report here instead of stdout")
+    parser.add_argument("--top", type=positive_int, metavar="N", help="list only the N highest marks")
+    parser.add_argument("--bottom", type=positive_int, metavar="N", help="list only the N lowest marks")
+    parser.add_argument("--page", type=positive_int, default=1, help="page of students to list (default: 1)")
+    parser.add_argument("--page-size", type=positive_int, default=REPORT_PAGE_SIZE,
+                        help=f"students per page (default: {REPORT_PAGE_SIZE})")
+    parser.add_argument("--all", action="store_true", help="list every student")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.bench)
+    elif args.input:
+        try:
+            ok = write_report(args.input, args.format, args.out, args.top, args.bottom,
+                              args.page, args.page_size, args.all)
+        except (OSError, ValueError, csv.Error) as e:
+            print("Error loading CSV:", e, file=sys.stderr)
+            ok = False
+        sys.exit(0 if ok else 1)
+    elif args.batch:
+        files = find_csv_files(args.batch)
+        if not files:
+            print(f"No CSV files found for {args.batch}")
+        else:
+            print_batch_report(*analyze_files(files, args.workers), show_files=args.per_file)
+    else:
+        main()
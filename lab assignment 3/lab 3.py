@@ -1,20 +1,164 @@
+import argparse
+import atexit
+import gc
+import http.client
 import json
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 import logging
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Queued logging hands records to the file writer in batches of this size,
+# and at least this often (seconds) so a quiet program's log stays current
+LOG_BATCH_SIZE = 256
+LOG_FLUSH_INTERVAL = 1.0
+
+BOOK_STATUSES = ("available", "issued")
+
+# Service mode: seconds between coalesced saves, and number of ISBN lock stripes
+SERVICE_FLUSH_INTERVAL = 1.0
+ISBN_LOCK_STRIPES = 64
+
+# Per-item outcomes reported by issue_many/return_many: (changed, skipped)
+BATCH_RESULTS = {"issue": ("issued", "already issued"), "return": ("returned", "not issued")}
+
+# Length of the title n-grams used by the substring search index
+TITLE_GRAM_SIZE = 3
+
+# In journal mode, fold the journal into a fresh snapshot after this many records
+JOURNAL_COMPACT_EVERY = 1000
+
+# Inventory files with these suffixes are opened with the SQLite backend
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+
 # Setup logging
-logging.basicConfig(filename="library.log", level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+class _DeferredQueueHandler(QueueHandler):
+    # The stock prepare() formats on the caller's thread; leave that to the listener
+    def prepare(self, record):
+        return record
+
+
+class _TimedMemoryHandler(MemoryHandler):
+    # Also flushes once the buffered batch is LOG_FLUSH_INTERVAL old
+    def __init__(self, capacity, flushLevel, target):
+        super().__init__(capacity, flushLevel=flushLevel, target=target)
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record):
+        return (super().shouldFlush(record)
+                or time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL)
+
+    def flush(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+
+
+class _BatchingQueueListener(QueueListener):
+    # While the queue is idle, flush the batch every LOG_FLUSH_INTERVAL
+    # instead of holding it until the next record arrives
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=LOG_FLUSH_INTERVAL)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+
+_log_listener = None
+
+
+def _stop_log_listener():
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    for batched in _log_listener.handlers:
+        target = batched.target
+        batched.close()
+        target.close()
+    _log_listener = None
+
+
+def setup_logging(log_file="library.log", queued=False, max_bytes=0, backup_count=0,
+                  level=logging.INFO):
+    _stop_log_listener()
+    if max_bytes:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    else:
+        file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    if not queued:
+        logging.basicConfig(level=level, handlers=[file_handler], force=True)
+        return
+
+    # Callers only enqueue; a listener thread formats and writes in batches
+    global _log_listener
+    log_queue = queue.SimpleQueue()
+    batched = _TimedMemoryHandler(LOG_BATCH_SIZE, flushLevel=logging.ERROR, target=file_handler)
+    _log_listener = _BatchingQueueListener(log_queue, batched)
+    logging.basicConfig(level=level, handlers=[_DeferredQueueHandler(log_queue)], force=True)
+    _log_listener.start()
+
+
+setup_logging()
+atexit.register(_stop_log_listener)
+
+
+def intern_text(value):
+    # Authors repeat across many books; only exact str values can be interned
+    return sys.intern(value) if type(value) is str else value
 
 
 # Task 1: Book Class
 class Book:
+    # Slots instead of a per-instance __dict__, and status kept as a flag:
+    # with millions of books these objects dominate resident memory.
+    __slots__ = ("title", "author", "isbn", "_issued")
+
     def __init__(self, title, author, isbn, status="available"):
         self.title = title
-        self.author = author
+        self.author = intern_text(author)
         self.isbn = isbn
         self.status = status
 
+    @classmethod
+    def from_stored(cls, title, author, isbn, status):
+        # A status this program does not know (e.g. "lost") is kept verbatim
+        # so saving writes it back unchanged; such a book never circulates
+        book = cls(title, author, isbn)
+        if status in BOOK_STATUSES:
+            book.status = status
+        else:
+            book._issued = status
+        return book
+
+    @property
+    def status(self):
+        if isinstance(self._issued, str):
+            return self._issued
+        return "issued" if self._issued else "available"
+
+    @status.setter
+    def status(self, value):
+        if value not in BOOK_STATUSES:
+            raise ValueError(f"Unknown book status: {value}")
+        self._issued = value == "issued"
+
     def __str__(self):
         return f"Title: {self.title}, Author: {self.author}, ISBN: {self.isbn}, Status: {self.status}"
 
@@ -29,37 +173,254 @@ class Book:
     def issue(self):
         if self.is_available():
             self.status = "issued"
-            logging.info(f"Issued book: {self.title}")
+            logging.info("Issued book: %s", self.title)
             return True
         else:
-            logging.warning(f"Attempted to issue unavailable book: {self.title}")
+            logging.warning("Attempted to issue unavailable book: %s", self.title)
             return False
 
     def return_book(self):
         self.status = "available"
-        logging.info(f"Returned book: {self.title}")
+        logging.info("Returned book: %s", self.title)
 
     def is_available(self):
         return self.status == "available"
 
 
+def book_from_dict(data):
+    # One catalog row -> Book. Rows that cannot be indexed raise ValueError;
+    # a status other than available/issued is kept as stored.
+    if not isinstance(data, dict):
+        raise ValueError("not a JSON object")
+    missing = [field for field in ("title", "author", "isbn") if field not in data]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if not isinstance(data["title"], str) or not isinstance(data["isbn"], str):
+        raise ValueError("title and isbn must be strings")
+    status = data.get("status", "available")
+    if status not in BOOK_STATUSES:
+        logging.warning("Book %s has unknown status %r; kept as is and not circulated.", data["isbn"], status)
+    return Book.from_stored(data["title"], data["author"], data["isbn"], status)
+
+
+# Columnar catalog: parallel lists instead of one object per book. Book
+# views are only created when a position is accessed.
+class BookCatalog:
+    def __init__(self):
+        self.titles = []
+        self.authors = []
+        self.isbns = []
+        self.issued = bytearray()
+        self.other_status = {}  # position -> unknown stored status, kept verbatim
+
+    @classmethod
+    def from_dicts(cls, books_data):
+        catalog = cls()
+        for data in books_data:
+            catalog.append(Book(**data))
+        return catalog
+
+    def append(self, book):
+        self.titles.append(book.title)
+        self.authors.append(intern_text(book.author))
+        status = book.status
+        if status not in BOOK_STATUSES:
+            self.other_status[len(self.isbns)] = status
+        self.isbns.append(book.isbn)
+        self.issued.append(status != "available")
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("catalog index out of range")
+        return BookView(self, position)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield BookView(self, position)
+
+
+class BookView(Book):
+    # Reads and writes go straight to the catalog columns
+    __slots__ = ("_catalog", "_position")
+
+    def __init__(self, catalog, position):
+        self._catalog = catalog
+        self._position = position
+
+    @property
+    def title(self):
+        return self._catalog.titles[self._position]
+
+    @property
+    def author(self):
+        return self._catalog.authors[self._position]
+
+    @property
+    def isbn(self):
+        return self._catalog.isbns[self._position]
+
+    @property
+    def status(self):
+        if self._catalog.other_status and self._position in self._catalog.other_status:
+            return self._catalog.other_status[self._position]
+        return "issued" if self._catalog.issued[self._position] else "available"
+
+    @status.setter
+    def status(self, value):
+        if value not in BOOK_STATUSES:
+            raise ValueError(f"Unknown book status: {value}")
+        self._catalog.other_status.pop(self._position, None)
+        self._catalog.issued[self._position] = value == "issued"
+
+
 # Task 2: LibraryInventory Class
 class LibraryInventory:
-    def __init__(self, file_path="books.json"):
+    def __init__(self, file_path="books.json", journal=False,
+                 compact_every=JOURNAL_COMPACT_EVERY, columnar=False, autosave=True):
         self.file_path = Path(file_path)
-        self.books = []
+        self.columnar = columnar
+        # Guards the catalog structure and the files; re-entrant because
+        # add_book -> _persist -> save_books nest
+        self.lock = threading.RLock()
+        # With autosave off, JSON mode only marks the inventory dirty and
+        # the owner decides when to call save_books
+        self.autosave = autosave
+        self.dirty = False
+        self.books = self._make_books([])
+        self.isbn_index = {}    # isbn -> list of positions in self.books
+        self.title_index = {}   # title trigram -> set of positions in self.books
+
+        # Journal mode: mutations are appended to <file>.journal and only
+        # folded into the JSON snapshot every `compact_every` records.
+        self.journal = journal
+        self.journal_path = self.file_path.with_name(self.file_path.name + ".journal")
+        self.compact_every = compact_every
+        self._journal_file = None
+        self._journal_records = 0
+        self._seq = 0
         self.load_books()
 
+    def _make_books(self, books_data):
+        # A bad row is skipped with a warning instead of emptying the catalog
+        books = BookCatalog() if self.columnar else []
+        for row, data in enumerate(books_data, 1):
+            try:
+                books.append(book_from_dict(data))
+            except ValueError as e:
+                logging.warning("Skipping book %s in %s: %s", row, self.file_path, e)
+        return books
+
+    # Indexes: keep ISBN and title lookups independent of catalog size
+    def _title_grams(self, text):
+        text = text.lower()
+        return {text[i:i + TITLE_GRAM_SIZE] for i in range(len(text) - TITLE_GRAM_SIZE + 1)}
+
+    def _index_book(self, position, book):
+        # Grams first: a title that cannot be indexed fails before any index changes
+        grams = self._title_grams(book.title)
+        self.isbn_index.setdefault(book.isbn, []).append(position)
+        for gram in grams:
+            self.title_index.setdefault(gram, set()).add(position)
+
+    def rebuild_indexes(self):
+        self.isbn_index = {}
+        self.title_index = {}
+        for position, book in enumerate(self.books):
+            self._index_book(position, book)
+
     def add_book(self, book):
-        self.books.append(book)
-        logging.info(f"Added book: {book.title}")
-        self.save_books()
+        with self.lock:
+            # Indexed before it is appended: a book that cannot be indexed is
+            # never added, so it can never be saved
+            self._index_book(len(self.books), book)
+            self.books.append(book)
+            logging.info("Added book: %s", book.title)
+            self._persist({"op": "add", "book": book.to_dict()})
+
+    # Single circulation changes the copy journal replay would pick
+    # (_first_copy), and only a real status change is journaled
+    def issue_book(self, book):
+        with self.lock:
+            copy = self._first_copy(book.isbn, issued=False)
+            if copy is None or not copy.issue():
+                if copy is None:
+                    logging.warning("Attempted to issue unknown book: %s", book.title)
+                return False
+            self._persist({"op": "issue", "isbn": book.isbn})
+            return True
+
+    def return_book(self, book):
+        with self.lock:
+            copy = self._first_copy(book.isbn, issued=True)
+            if copy is None or copy.status != "issued":
+                logging.warning("Attempted to return a book that is not issued: %s", book.title)
+                return False
+            copy.return_book()
+            self._persist({"op": "return", "isbn": book.isbn})
+            return True
+
+    # Batch circulation: one persist and one log line for the whole batch
+    def _first_copy(self, isbn, issued):
+        positions = self.isbn_index.get(isbn)
+        if not positions:
+            return None
+        wanted = "issued" if issued else "available"
+        for pos in positions:
+            book = self.books[pos]
+            if book.status == wanted:
+                return book
+        return self.books[positions[0]]
+
+    def _change_many(self, op, isbns):
+        issued = op == "return"
+        old_status, new_status = ("issued", "available") if issued else ("available", "issued")
+        done, skipped = BATCH_RESULTS[op]
+        results = []
+        changed = []
+        # Under the inventory lock: LibraryService only holds per-ISBN stripe
+        # locks, and a concurrent add_book indexes a book before appending it
+        with self.lock:
+            for isbn in isbns:
+                book = self._first_copy(isbn, issued)
+                if book is None:
+                    results.append((isbn, "not found"))
+                elif book.status != old_status:
+                    results.append((isbn, skipped))
+                else:
+                    book.status = new_status
+                    changed.append(isbn)
+                    results.append((isbn, done))
+            if changed:
+                self._persist({"op": op, "isbns": changed})
+        logging.info("Batch %s: %s of %s books %s.", op, len(changed), len(results), done)
+        return results
+
+    def issue_many(self, isbns):
+        return self._change_many("issue", isbns)
+
+    def return_many(self, isbns):
+        return self._change_many("return", isbns)
 
     def search_by_title(self, title):
-        return [book for book in self.books if title.lower() in book.title.lower()]
+        query = title.lower()
+        grams = self._title_grams(query)
+        if not grams:
+            # Queries shorter than one trigram match most of the catalog anyway
+            return [book for book in self.books if query in book.title.lower()]
+
+        with self.lock:
+            postings = sorted((self.title_index.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        return [self.books[pos] for pos in sorted(candidates)
+                if query in self.books[pos].title.lower()]
 
     def search_by_isbn(self, isbn):
-        return [book for book in self.books if book.isbn == isbn]
+        return [self.books[pos] for pos in self.isbn_index.get(isbn, [])]
 
     def display_all(self):
         if not self.books:
@@ -68,34 +429,586 @@ class LibraryInventory:
             print(book)
 
     # Task 3: File Persistence
+    def _persist(self, record):
+        if not self.journal:
+            if self.autosave:
+                self.save_books()
+            else:
+                self.dirty = True
+            return
+        with self.lock:
+            self._seq += 1
+            record["seq"] = self._seq
+            try:
+                self._append_journal(record)
+            except Exception as e:
+                logging.error("Error writing journal record: %s", e)
+                return
+            self._journal_records += 1
+            if self._journal_records >= self.compact_every:
+                self.compact()
+
+    def _append_journal(self, record):
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, 'a')
+            # A torn last line from a crash must not swallow the next record
+            if self._journal_file.tell() > 0:
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._journal_file.write("\n")
+        self._journal_file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self._journal_file.flush()
+
     def save_books(self):
-        try:
-            with open(self.file_path, 'w') as f:
-                json.dump([book.to_dict() for book in self.books], f, indent=4)
-            logging.info("Books saved to JSON file.")
-        except Exception as e:
-            logging.error(f"Error saving books: {e}")
+        with self.lock:
+            self.dirty = False
+            # The snapshot remembers the last journal record it already
+            # contains, in both modes, so a later journal run never re-applies it
+            books_data = {"seq": self._seq, "books": [book.to_dict() for book in self.books]}
+            tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(books_data, f, indent=None if self.journal else 4)
+                os.replace(tmp_path, self.file_path)
+                logging.info("Books saved to JSON file.")
+                return True
+            except Exception as e:
+                logging.error("Error saving books: %s", e)
+                self.dirty = True
+                return False
+
+    def compact(self):
+        with self.lock:
+            if not self.save_books():
+                return
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+            with open(self.journal_path, 'w'):
+                pass
+            self._journal_records = 0
+            logging.info("Journal compacted into snapshot.")
+
+    def close(self):
+        if self.journal:
+            self.compact()
+        elif self.dirty:
+            self.save_books()
 
     def load_books(self):
+        self.books = self._make_books([])
+        snapshot_seq = 0
         if not self.file_path.exists():
             logging.info("Books file does not exist, starting with empty inventory.")
+        else:
+            try:
+                with open(self.file_path, 'r') as f:
+                    books_data = json.load(f)
+                if isinstance(books_data, dict):
+                    snapshot_seq = books_data.get("seq", 0)
+                    books_data = books_data["books"]
+                self.books = self._make_books(books_data)
+                logging.info("Books loaded from JSON file.")
+            except json.JSONDecodeError:
+                logging.error("Error decoding JSON file. Starting with empty inventory.")
+                self.books = self._make_books([])
+            except Exception as e:
+                logging.error("Unexpected error loading books: %s", e)
+                self.books = self._make_books([])
+        self._seq = snapshot_seq
+        self.rebuild_indexes()
+        # Replayed in either mode: records not yet compacted would otherwise be lost
+        self._replay_journal(snapshot_seq)
+
+    def _replay_journal(self, snapshot_seq):
+        self._journal_records = 0
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, 'r') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning("Skipping torn journal record at line %s", line_no)
+                    continue
+                self._journal_records += 1
+                # Records already folded into the snapshot by an interrupted compaction
+                if record.get("seq", 0) <= snapshot_seq:
+                    continue
+                self._apply_record(record)
+                self._seq = max(self._seq, record["seq"])
+        logging.info("Replayed %s journal records.", self._journal_records)
+
+    def _apply_record(self, record):
+        if record["op"] == "add":
+            try:
+                book = book_from_dict(record.get("book"))
+            except ValueError as e:
+                logging.warning("Skipping journal record %s: %s", record.get("seq"), e)
+                return
+            self.books.append(book)
+            self._index_book(len(self.books) - 1, self.books[-1])
+            return
+        issued = record["op"] == "return"
+        for isbn in record.get("isbns", [record.get("isbn")]):
+            book = self._first_copy(isbn, issued)
+            if book is None:
+                logging.warning("Journal refers to unknown ISBN: %s", isbn)
+                continue
+            book.status = "available" if issued else "issued"
+
+
+# SQLite storage: same API as LibraryInventory, but lookups run as indexed
+# queries and books are only materialised when a query returns them.
+class SQLiteLibraryInventory:
+    def __init__(self, file_path="books.db"):
+        self.file_path = Path(file_path)
+        # LibraryService serialises access, so the connection may be used
+        # from its worker threads
+        self.conn = sqlite3.connect(self.file_path, check_same_thread=False)
+        self.load_books()
+
+    def load_books(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS books (
+                title  TEXT NOT NULL,
+                author TEXT NOT NULL,
+                isbn   TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'available'
+            );
+            CREATE INDEX IF NOT EXISTS idx_books_isbn ON books (isbn);
+            CREATE INDEX IF NOT EXISTS idx_books_title ON books (title COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_books_status ON books (status);
+        """)
+        # Trigram full-text index for substring title search (SQLite >= 3.34)
+        fts_exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'books_fts'").fetchone() is not None
+        try:
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS books_fts
+                    USING fts5(title, content='books', tokenize='trigram');
+                CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+                    INSERT INTO books_fts (rowid, title) VALUES (new.rowid, new.title);
+                END;
+                CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+                    INSERT INTO books_fts (books_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+                END;
+            """)
+            if not fts_exists:
+                self.conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            logging.warning("SQLite has no FTS5 trigram tokenizer, title search will scan.")
+            self.has_fts = False
+        self.conn.commit()
+        logging.info("Opened SQLite inventory: %s", self.file_path)
+
+    def _query(self, sql, params=()):
+        return [Book.from_stored(*row) for row in self.conn.execute(sql, params)]
+
+    def add_book(self, book):
+        self.add_books([book])
+        logging.info("Added book: %s", book.title)
+
+    def add_books(self, books):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO books (title, author, isbn, status) VALUES (?, ?, ?, ?)",
+                ((b.title, b.author, b.isbn, b.status) for b in books))
+
+    def _set_status(self, isbn, old_status, new_status):
+        # Touch the first copy in the old state, so two desks cannot both
+        # issue the same copy
+        cur = self.conn.execute(
+            "UPDATE books SET status = ? WHERE rowid = ("
+            "SELECT rowid FROM books WHERE isbn = ? AND status = ? ORDER BY rowid LIMIT 1)",
+            (new_status, isbn, old_status))
+        return cur.rowcount == 1
+
+    def issue_book(self, book):
+        with self.conn:
+            issued = book.is_available() and self._set_status(book.isbn, "available", "issued")
+        if not issued:
+            logging.warning("Attempted to issue unavailable book: %s", book.title)
+            return False
+        return book.issue()
+
+    def return_book(self, book):
+        with self.conn:
+            returned = self._set_status(book.isbn, "issued", "available")
+        if not returned:
+            logging.warning("Attempted to return a book that is not issued: %s", book.title)
+            return False
+        book.return_book()
+        return True
+
+    def _change_many(self, op, isbns):
+        old_status, new_status = ("available", "issued") if op == "issue" else ("issued", "available")
+        done, skipped = BATCH_RESULTS[op]
+        results = []
+        changed = 0
+        with self.conn:
+            for isbn in isbns:
+                if self._set_status(isbn, old_status, new_status):
+                    changed += 1
+                    results.append((isbn, done))
+                elif self.conn.execute("SELECT 1 FROM books WHERE isbn = ? LIMIT 1", (isbn,)).fetchone():
+                    results.append((isbn, skipped))
+                else:
+                    results.append((isbn, "not found"))
+        logging.info("Batch %s: %s of %s books %s.", op, changed, len(results), done)
+        return results
+
+    def issue_many(self, isbns):
+        return self._change_many("issue", isbns)
+
+    def return_many(self, isbns):
+        return self._change_many("return", isbns)
+
+    def search_by_title(self, title):
+        if self.has_fts and len(title) >= TITLE_GRAM_SIZE:
+            phrase = '"' + title.replace('"', '""') + '"'
+            return self._query(
+                "SELECT b.title, b.author, b.isbn, b.status FROM books_fts "
+                "JOIN books b ON b.rowid = books_fts.rowid "
+                "WHERE books_fts MATCH ? ORDER BY b.rowid", (phrase,))
+        pattern = "%" + title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return self._query(
+            "SELECT title, author, isbn, status FROM books "
+            "WHERE title LIKE ? ESCAPE '\\' ORDER BY rowid", (pattern,))
+
+    def search_by_isbn(self, isbn):
+        return self._query(
+            "SELECT title, author, isbn, status FROM books WHERE isbn = ? ORDER BY rowid", (isbn,))
+
+    def display_all(self):
+        empty = True
+        for row in self.conn.execute("SELECT title, author, isbn, status FROM books ORDER BY rowid"):
+            empty = False
+            print(Book.from_stored(*row))
+        if empty:
+            print("No books in the inventory.")
+
+    def save_books(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def open_inventory(file_path, journal=False, columnar=False):
+    if Path(file_path).suffix in SQLITE_SUFFIXES:
+        return SQLiteLibraryInventory(file_path)
+    return LibraryInventory(file_path, journal=journal, columnar=columnar)
+
+
+def read_isbns(path):
+    # One ISBN per line; "-" reads from stdin
+    f = sys.stdin if path == "-" else open(path, 'r')
+    try:
+        return [line.strip() for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def run_batch(inventory, op, isbns):
+    results = inventory.issue_many(isbns) if op == "issue" else inventory.return_many(isbns)
+    lines = [f"{isbn}: {result}" for isbn, result in results]
+    done = sum(1 for _, result in results if result == BATCH_RESULTS[op][0])
+    lines.append(f"{done} of {len(results)} books processed.")
+    print("\n".join(lines))
+    return results
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    # Only into an empty database: the migration appends, so running it
+    # twice would list every book twice
+    json_path = Path(json_path)
+    target = SQLiteLibraryInventory(db_path)
+    try:
+        existing = target.conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        if existing:
+            raise ValueError(f"{db_path} already holds {existing} books; migrate into a new database")
+        source = LibraryInventory(json_path, journal=json_path.with_name(json_path.name + ".journal").exists())
+        target.add_books(source.books)
+    finally:
+        target.close()
+    logging.info("Migrated %s books from %s to %s", len(source.books), json_path, db_path)
+    return len(source.books)
+
+
+# Concurrent service: several desks share one inventory over local HTTP/JSON
+class LibraryService:
+    def __init__(self, inventory, flush_interval=SERVICE_FLUSH_INTERVAL,
+                 lock_stripes=ISBN_LOCK_STRIPES):
+        self.inventory = inventory
+        self.flush_interval = flush_interval
+        if isinstance(inventory, SQLiteLibraryInventory):
+            # One connection: every request takes the same lock
+            self.catalog_lock = threading.Lock()
+            self.isbn_locks = [self.catalog_lock]
+        else:
+            # Persistence is coalesced by the flusher thread below
+            inventory.autosave = False
+            self.catalog_lock = inventory.lock
+            self.isbn_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def _isbn_lock(self, isbn):
+        return self.isbn_locks[hash(isbn) % len(self.isbn_locks)]
+
+    def add(self, title, author, isbn):
+        for field, value in (("title", title), ("author", author), ("isbn", isbn)):
+            if not isinstance(value, str):
+                raise TypeError(f"{field} must be a string")
+        book = Book(title, author, isbn)
+        with self.catalog_lock:
+            self.inventory.add_book(book)
+        return book.to_dict()
+
+    def search(self, title=None, isbn=None):
+        with self.catalog_lock:
+            books = self.inventory.search_by_isbn(isbn) if isbn is not None \
+                else self.inventory.search_by_title(title or "")
+            return [book.to_dict() for book in books]
+
+    def circulate(self, op, isbns):
+        # The ISBN lock makes check-and-set atomic, so a copy can never be
+        # issued to two desks at once
+        results = []
+        for isbn in isbns:
+            with self._isbn_lock(isbn):
+                if op == "issue":
+                    results.extend(self.inventory.issue_many([isbn]))
+                else:
+                    results.extend(self.inventory.return_many([isbn]))
+        return results
+
+    def flush(self):
+        if getattr(self.inventory, "dirty", False):
+            self.inventory.save_books()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        self._flusher = threading.Thread(target=self._flush_loop, name="library-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        self.inventory.close()
+
+
+class LibraryRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive so a desk can reuse its connection; headers and body go out
+    # in separate writes, so Nagle would stall every response on delayed ACKs
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/books":
+            self._send_json(404, {"error": "not found"})
             return
+        query = parse_qs(url.query)
+        books = self.server.service.search(title=query.get("title", [None])[0],
+                                           isbn=query.get("isbn", [None])[0])
+        self._send_json(200, {"books": books})
+
+    def do_POST(self):
         try:
-            with open(self.file_path, 'r') as f:
-                books_data = json.load(f)
-                self.books = [Book(**data) for data in books_data]
-            logging.info("Books loaded from JSON file.")
-        except json.JSONDecodeError:
-            logging.error("Error decoding JSON file. Starting with empty inventory.")
-            self.books = []
-        except Exception as e:
-            logging.error(f"Unexpected error loading books: {e}")
-            self.books = []
+            data = self._read_json()
+            if not isinstance(data, dict):
+                raise TypeError("body must be a JSON object")
+            if self.path == "/books":
+                book = self.server.service.add(data["title"], data["author"], data["isbn"])
+                self._send_json(201, {"book": book})
+            elif self.path in ("/issue", "/return"):
+                isbns = data["isbns"] if "isbns" in data else [data["isbn"]]
+                if not isinstance(isbns, list) or not all(isinstance(isbn, str) for isbn in isbns):
+                    raise TypeError("isbns must be a list of strings")
+                results = self.server.service.circulate(self.path[1:], isbns)
+                self._send_json(200, {"results": [{"isbn": isbn, "result": result}
+                                                  for isbn, result in results]})
+            else:
+                self._send_json(404, {"error": "not found"})
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(service, host="127.0.0.1", port=8000):
+    server = ThreadingHTTPServer((host, port), LibraryRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(file_path="books.json", host="127.0.0.1", port=8000, journal=False, columnar=False):
+    service = LibraryService(open_inventory(file_path, journal=journal, columnar=columnar))
+    server = make_server(service, host, port)
+    service.start()
+    print(f"Library service listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+def benchmark_service(requests=20000, clients=8, books=10000):
+    # Load generator: mixed searches and circulation against a local server
+    tmp_dir = tempfile.TemporaryDirectory()
+    inventory = LibraryInventory(Path(tmp_dir.name) / "books.json", autosave=False)
+    for i in range(books):
+        inventory.books.append(Book(f"Book Title {i}", f"Author {i % 500}", f"978{i:010d}"))
+    inventory.rebuild_indexes()
+    service = LibraryService(inventory)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service.start()
+
+    latencies = []
+    per_client = requests // clients
+
+    def desk(seed):
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        mine = []
+        for n in range(per_client):
+            i = (seed * 7919 + n * 104729) % books
+            if n % 4 == 0:
+                method, path, body = "POST", "/issue", {"isbn": f"978{i % 100:010d}"}
+            elif n % 4 == 1:
+                method, path, body = "POST", "/return", {"isbn": f"978{i % 100:010d}"}
+            elif n % 4 == 2:
+                method, path, body = "GET", f"/books?isbn=978{i:010d}", None
+            else:
+                method, path, body = "GET", f"/books?title=Title%20{i}", None
+            start = time.perf_counter()
+            conn.request(method, path, body=json.dumps(body) if body else None,
+                         headers={"Content-Type": "application/json"})
+            conn.getresponse().read()
+            mine.append(time.perf_counter() - start)
+        conn.close()
+        latencies.extend(mine)
+
+    desks = [threading.Thread(target=desk, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in desks:
+        t.start()
+    for t in desks:
+        t.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    service.stop()
+    tmp_dir.cleanup()
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"{total} requests from {clients} desks in {elapsed:.2f}s: {total / elapsed:,.0f} req/s")
+    print(f"latency p50 {latencies[total // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[min(total - 1, int(total * 0.99))] * 1000:.2f} ms")
+
+
+def benchmark_logging(n=100_000):
+    # Per-operation latency of issue/return with logging off, direct and queued
+    tmp_dir = tempfile.TemporaryDirectory()
+    books = [Book(f"Book Title {i}", f"Author {i % 500}", f"978{i:010d}") for i in range(1000)]
+    modes = [("logging off", None), ("direct file", False), ("queued + batched", True)]
+    print(f"Issue/return latency over {n:,} operations:")
+    for name, queued in modes:
+        log_file = Path(tmp_dir.name) / f"{name.split()[0]}.log"
+        setup_logging(log_file, queued=bool(queued))
+        if queued is None:
+            logging.disable(logging.CRITICAL)
+        timings = []
+        for i in range(n):
+            book = books[i % len(books)]
+            start = time.perf_counter()
+            if book.is_available():
+                book.issue()
+            else:
+                book.return_book()
+            timings.append(time.perf_counter() - start)
+        logging.disable(logging.NOTSET)
+        _stop_log_listener()
+        timings.sort()
+        print(f"{name:<18} mean {sum(timings) / n * 1e6:7.2f} us   "
+              f"p99 {timings[int(n * 0.99)] * 1e6:7.2f} us")
+    setup_logging()
+    tmp_dir.cleanup()
+
+
+# Memory benchmark: old dict-backed Book vs slotted Book vs columnar catalog
+class _DictBook:
+    def __init__(self, title, author, isbn, status="available"):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.status = status
+
+
+def _measure_layout(raw, build):
+    gc.collect()
+    tracemalloc.start()
+    books_data = json.loads(raw)
+    books = build(books_data)
+    del books_data
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del books
+    return size
+
+
+def benchmark_memory(n=1_000_000):
+    # Round-trip through JSON so every layout starts from what load_books sees
+    raw = json.dumps([{"title": f"Book Title {i}", "author": f"Author {i % 5000}",
+                       "isbn": f"978{i:010d}", "status": "issued" if i % 7 == 0 else "available"}
+                      for i in range(n)])
+    layouts = [
+        ("dict-backed Book", lambda data: [_DictBook(**d) for d in data]),
+        ("slotted Book", lambda data: [Book(**d) for d in data]),
+        ("columnar BookCatalog", BookCatalog.from_dicts),
+    ]
+    baseline = None
+    print(f"Resident memory for {n:,} books:")
+    for name, build in layouts:
+        size = _measure_layout(raw, build)
+        baseline = baseline or size
+        print(f"{name:<22} {size / 2**20:9.1f} MiB  ({size / n:6.1f} B/book, {size / baseline:4.0%} of old)")
 
 
 # Task 4: CLI Interface
-def main_menu():
-    inventory = LibraryInventory()
+def main_menu(file_path="books.json", journal=False, columnar=False):
+    inventory = open_inventory(file_path, journal=journal, columnar=columnar)
 
     while True:
         print("\n==== Library Inventory Manager ====")
@@ -121,8 +1034,7 @@ def main_menu():
             books = inventory.search_by_isbn(isbn)
             if books:
                 book = books[0]
-                if book.issue():
-                    inventory.save_books()
+                if inventory.issue_book(book):
                     print(f"Book '{book.title}' issued successfully.")
                 else:
                     print(f"Book '{book.title}' is already issued.")
@@ -134,9 +1046,10 @@ def main_menu():
             books = inventory.search_by_isbn(isbn)
             if books:
                 book = books[0]
-                book.return_book()
-                inventory.save_books()
-                print(f"Book '{book.title}' returned successfully.")
+                if inventory.return_book(book):
+                    print(f"Book '{book.title}' returned successfully.")
+                else:
+                    print(f"Book '{book.title}' is not issued.")
             else:
                 print("Book not found.")
 
@@ -162,6 +1075,7 @@ def main_menu():
                 print("No matching books found.")
 
         elif choice == "6":
+            inventory.close()
             print("Exiting Library Inventory Manager. Goodbye!")
             break
         else:
@@ -169,4 +1083,61 @@ def main_menu():
 
 
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Library Inventory Manager")
+    parser.add_argument("--file", default="books.json",
+                        help="inventory file; .db/.sqlite/.sqlite3 selects the SQLite backend")
+    parser.add_argument("--journal", action="store_true",
+                        help="append mutations to <file>.journal instead of rewriting the JSON file")
+    parser.add_argument("--columnar", action="store_true",
+                        help="keep the JSON catalog in column lists instead of Book objects")
+    parser.add_argument("--bench-memory", type=int, metavar="N",
+                        help="compare memory of the book layouts for N books and exit")
+    parser.add_argument("--issue-file", metavar="PATH",
+                        help="issue every ISBN listed in PATH (one per line, - for stdin) and exit")
+    parser.add_argument("--return-file", metavar="PATH",
+                        help="return every ISBN listed in PATH (one per line, - for stdin) and exit")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the HTTP/JSON service instead of the interactive menu")
+    parser.add_argument("--host", default="127.0.0.1", help="service address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="service port (default: 8000)")
+    parser.add_argument("--bench-service", type=int, metavar="N",
+                        help="send N mixed requests to a local service and report req/s and p99")
+    parser.add_argument("--log-file", default="library.log", help="log file (default: library.log)")
+    parser.add_argument("--log-queue", action="store_true",
+                        help="write the log from a background thread in batches "
+                             "(flushed at least every second)")
+    parser.add_argument("--log-max-bytes", type=int, default=0,
+                        help="rotate the log file at this size (default: never)")
+    parser.add_argument("--log-backups", type=int, default=3,
+                        help="rotated log files to keep (default: 3)")
+    parser.add_argument("--bench-logging", type=int, metavar="N",
+                        help="time N issue/return operations with each logging setup and exit")
+    parser.add_argument("--migrate", nargs=2, metavar=("JSON", "DB"),
+                        help="copy a JSON inventory into an SQLite database and exit")
+    args = parser.parse_args()
+    setup_logging(args.log_file, queued=args.log_queue, max_bytes=args.log_max_bytes,
+                  backup_count=args.log_backups)
+    if args.bench_logging:
+        benchmark_logging(args.bench_logging)
+    elif args.bench_memory:
+        benchmark_memory(args.bench_memory)
+    elif args.bench_service:
+        benchmark_service(args.bench_service)
+    elif args.serve:
+        serve(args.file, args.host, args.port, journal=args.journal, columnar=args.columnar)
+    elif args.issue_file or args.return_file:
+        inventory = open_inventory(args.file, journal=args.journal, columnar=args.columnar)
+        if args.issue_file:
+            run_batch(inventory, "issue", read_isbns(args.issue_file))
+        if args.return_file:
+            run_batch(inventory, "return", read_isbns(args.return_file))
+        inventory.close()
+    elif args.migrate:
+        try:
+            count = migrate_json_to_sqlite(*args.migrate)
+        except ValueError as e:
+            print(f"Migration refused: {e}")
+            sys.exit(1)
+        print(f"Migrated {count} books into {args.migrate[1]}.")
+    else:
+        main_menu(args.file, journal=args.journal, columnar=args.columnar)
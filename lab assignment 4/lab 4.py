@@ -5,34 +5,157 @@
 # -------------------------------
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # headless: plots are saved to PNG, never shown
 import matplotlib.pyplot as plt
+import hashlib
+import json
+import os
+import time
 
 # -------------------------------
 # Task 2: Data Acquisition & Loading
 # -------------------------------
-# Load the dataset
-df = pd.read_csv('weather_data.csv')
+DATA_FILE = 'weather_data.csv'
+# The cleaned frame is cached as one .npy file per column; the cache is
+# rebuilt whenever the CSV's mtime or size (or SHA-1, if enabled) changes
+CACHE_DIR = os.path.join('.cache', os.path.basename(DATA_FILE))
+CACHE_CHECK_HASH = False
+COLUMNS = ['Date', 'Temperature', 'Rainfall', 'Humidity']
+VALUE_COLUMNS = ['Temperature', 'Rainfall', 'Humidity']
 
-# Inspect the dataset
-print("Dataset Head:\n", df.head())
-print("\nDataset Info:\n", df.info())
-print("\nDataset Description:\n", df.describe())
+# Seasons in alphabetical order, the order groupby has always printed them in;
+# SEASON_CODES[month] is that month's position in SEASONS (index 0 is unused)
+SEASONS = ['Autumn', 'Spring', 'Summer', 'Winter']
+SEASON_CODES = np.array([-1, 3, 3, 1, 1, 1, 2, 2, 2, 0, 0, 0, 3])
 
-# -------------------------------
-# Task 3: Data Cleaning & Processing
-# -------------------------------
-# Handle missing values (drop rows with NaNs)
-df = df.dropna()
 
-# Convert 'Date' column to datetime
-df['Date'] = pd.to_datetime(df['Date'])
+def source_fingerprint(path, check_hash=False):
+    stat = os.stat(path)
+    fingerprint = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    if check_hash:
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(block)
+        fingerprint['sha1'] = sha1.hexdigest()
+    return fingerprint
+
+
+def read_cache(fingerprint):
+    try:
+        with open(os.path.join(CACHE_DIR, 'meta.json')) as f:
+            if json.load(f) != {'source': os.path.abspath(DATA_FILE), 'fingerprint': fingerprint}:
+                return None
+        return pd.DataFrame({col: np.load(os.path.join(CACHE_DIR, col + '.npy'), mmap_mode='r')
+                             for col in COLUMNS})
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(df, fingerprint):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta_path = os.path.join(CACHE_DIR, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for col in COLUMNS:
+        np.save(os.path.join(CACHE_DIR, col + '.npy'), df[col].to_numpy())
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump({'source': os.path.abspath(DATA_FILE), 'fingerprint': fingerprint}, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+start = time.perf_counter()
+fingerprint = source_fingerprint(DATA_FILE, CACHE_CHECK_HASH)
+df = read_cache(fingerprint)
+from_cache = df is not None
+
+if not from_cache:
+    # Load the dataset
+    df = pd.read_csv(DATA_FILE)
+
+    # Inspect the dataset
+    print("Dataset Head:\n", df.head())
+    print("\nDataset Info:\n", df.info())
+    print("\nDataset Description:\n", df.describe())
+
+    # -------------------------------
+    # Task 3: Data Cleaning & Processing
+    # -------------------------------
+    # Handle missing values (drop rows with NaNs)
+    df = df.dropna()
+
+    # Convert 'Date' column to datetime
+    df['Date'] = pd.to_datetime(df['Date'])
 
-# Filter relevant columns
-df = df[['Date', 'Temperature', 'Rainfall', 'Humidity']]
+    # Filter relevant columns
+    df = df[COLUMNS].reset_index(drop=True)
+    write_cache(df, fingerprint)
+else:
+    # Cleaned data straight from the cache
+    print("Dataset Head:\n", df.head())
+    print("\nDataset Description:\n", df.describe())
+
+print(f"\nLoaded {len(df)} rows in {time.perf_counter() - start:.2f}s "
+      f"({'warm: cache' if from_cache else 'cold: CSV, cache written'})")
 
 # -------------------------------
 # Task 4: Statistical Analysis
 # -------------------------------
+# Every aggregation level (calendar months, seasons, each month and each
+# year of the series) is rolled up from one groupby over the rows: partial
+# count / sum / min / max / M2 per year-month period.
+def month_to_season(months):
+    # Lookup table instead of one Python call per row
+    return pd.Categorical.from_codes(SEASON_CODES[np.asarray(months)], categories=SEASONS)
+
+
+def period_partials(df):
+    dates = df['Date'].dt
+    grouped = df[VALUE_COLUMNS].groupby((dates.year * 100 + dates.month).rename('Period'))
+    count = grouped.count()
+    return pd.concat({
+        'n': count,
+        'sum': grouped.sum(),
+        'min': grouped.min(),
+        'max': grouped.max(),
+        'm2': grouped.var(ddof=0).fillna(0) * count,
+    }, axis=1)
+
+
+def rollup(partials, keys):
+    # Merge period partials sharing a key; M2 uses the pairwise (Chan) update
+    def grouped(stat):
+        return partials[stat].groupby(keys, observed=True)
+
+    n = grouped('n').sum()
+    total = grouped('sum').sum()
+    mean = grouped('sum').transform('sum') / grouped('n').transform('sum')
+    spread = (partials['sum'] / partials['n'] - mean) ** 2 * partials['n']
+    m2 = (partials['m2'] + spread).groupby(keys, observed=True).sum()
+    return pd.DataFrame({
+        ('Temperature', 'mean'): total['Temperature'] / n['Temperature'],
+        ('Temperature', 'min'): grouped('min').min()['Temperature'],
+        ('Temperature', 'max'): grouped('max').max()['Temperature'],
+        ('Temperature', 'std'): (m2['Temperature'] / (n['Temperature'] - 1)) ** 0.5,
+        ('Rainfall', 'sum'): total['Rainfall'],
+        ('Humidity', 'mean'): total['Humidity'] / n['Humidity'],
+    })
+
+
+def on_calendar(stats, freq):
+    # Index by period end and fill gaps with empty periods, as resample() would
+    stats = stats.reindex(pd.date_range(stats.index.min(), stats.index.max(), freq=freq))
+    stats[('Rainfall', 'sum')] = stats[('Rainfall', 'sum')].fillna(0)
+    stats.index.name = 'Date'
+    return stats
+
+
+partials = period_partials(df)
+periods = partials.index.to_numpy()
+period_months = periods % 100
+BASIC = [('Temperature', 'mean'), ('Rainfall', 'sum'), ('Humidity', 'mean')]
+
 # Daily stats
 daily_mean = np.mean(df['Temperature'])
 daily_min = np.min(df['Temperature'])
@@ -42,21 +165,19 @@ daily_std = np.std(df['Temperature'])
 print(f"\nDaily Temperature Stats - Mean: {daily_mean:.2f}, Min: {daily_min}, Max: {daily_max}, Std: {daily_std:.2f}")
 
 # Monthly stats
-monthly_stats = df.resample('M', on='Date').agg({'Temperature': ['mean','min','max','std'],
-                                                 'Rainfall': 'sum',
-                                                 'Humidity': 'mean'})
+period_starts = pd.to_datetime(pd.DataFrame({'year': periods // 100, 'month': period_months, 'day': 1}))
+monthly_stats = on_calendar(rollup(partials, (period_starts + pd.offsets.MonthEnd(0)).to_numpy()), 'ME')
 print("\nMonthly Stats:\n", monthly_stats)
 
 # Yearly stats
-yearly_stats = df.resample('Y', on='Date').agg({'Temperature': ['mean','min','max','std'],
-                                                'Rainfall': 'sum',
-                                                'Humidity': 'mean'})
+year_ends = pd.to_datetime(pd.DataFrame({'year': periods // 100, 'month': 12, 'day': 31}))
+yearly_stats = on_calendar(rollup(partials, year_ends.to_numpy()), 'YE')
 print("\nYearly Stats:\n", yearly_stats)
 
 # -------------------------------
 # Task 5: Visualization
 # -------------------------------
-plt.style.use('seaborn-darkgrid')  # nicer plot style
+plt.style.use('seaborn-v0_8-darkgrid')  # nicer plot style (renamed in Matplotlib 3.6)
 
 # Line chart - Daily Temperature Trend
 plt.figure(figsize=(12,5))
@@ -65,17 +186,17 @@ plt.title('Daily Temperature Trend')
 plt.xlabel('Date')
 plt.ylabel('Temperature (°C)')
 plt.savefig('temperature_trend.png')
-plt.show()
+plt.close()
 
 # Bar chart - Monthly Rainfall
-monthly_rainfall = df.resample('M', on='Date')['Rainfall'].sum()
+monthly_rainfall = monthly_stats[('Rainfall', 'sum')].rename('Rainfall')
 plt.figure(figsize=(12,5))
 monthly_rainfall.plot(kind='bar', color='blue')
 plt.title('Monthly Rainfall')
 plt.xlabel('Month')
 plt.ylabel('Rainfall (mm)')
 plt.savefig('monthly_rainfall.png')
-plt.show()
+plt.close()
 
 # Scatter plot - Humidity vs Temperature
 plt.figure(figsize=(8,5))
@@ -84,7 +205,7 @@ plt.title('Humidity vs Temperature')
 plt.xlabel('Humidity (%)')
 plt.ylabel('Temperature (°C)')
 plt.savefig('humidity_vs_temperature.png')
-plt.show()
+plt.close()
 
 # Combined plot - Temperature and Rainfall
 fig, ax = plt.subplots(2, 1, figsize=(12,10))
@@ -98,36 +219,27 @@ ax[1].set_ylabel('Rainfall (mm)')
 
 plt.tight_layout()
 plt.savefig('combined_plot.png')
-plt.show()
+plt.close()
 
 # -------------------------------
 # Task 6: Grouping & Aggregation
 # -------------------------------
-# Group by month
-monthly_avg_temp = df.groupby(df['Date'].dt.month)['Temperature'].mean()
-monthly_total_rainfall = df.groupby(df['Date'].dt.month)['Rainfall'].sum()
-monthly_avg_humidity = df.groupby(df['Date'].dt.month)['Humidity'].mean()
+# Group by month (rolled up from the period partials, no new pass over the rows)
+calendar_stats = rollup(partials, period_months)[BASIC]
+calendar_stats.index.name = 'Date'
+monthly_total_rainfall = calendar_stats[('Rainfall', 'sum')]
 
 print("\nMonthly Aggregated Stats:\n")
 print(pd.DataFrame({
-    'Avg_Temperature': monthly_avg_temp,
+    'Avg_Temperature': calendar_stats[('Temperature', 'mean')],
     'Total_Rainfall': monthly_total_rainfall,
-    'Avg_Humidity': monthly_avg_humidity
+    'Avg_Humidity': calendar_stats[('Humidity', 'mean')]
 }))
 
 # Optional: Group by season
-def month_to_season(month):
-    if month in [12,1,2]:
-        return 'Winter'
-    elif month in [3,4,5]:
-        return 'Spring'
-    elif month in [6,7,8]:
-        return 'Summer'
-    else:
-        return 'Autumn'
-
-df['Season'] = df['Date'].dt.month.apply(month_to_season)
-seasonal_stats = df.groupby('Season').agg({'Temperature':'mean', 'Rainfall':'sum', 'Humidity':'mean'})
+df['Season'] = month_to_season(df['Date'].dt.month)
+seasonal_stats = rollup(partials, month_to_season(period_months))[BASIC].droplevel(1, axis=1)
+seasonal_stats.index.name = 'Season'
 print("\nSeasonal Stats:\n", seasonal_stats)
 
 # -------------------------------
@@ -2,141 +2,958 @@
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # headless: figures are only ever saved, never shown
 import matplotlib.pyplot as plt
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # -----------------------------
 # Configurations
 # -----------------------------
 DATA_FILE = "data/weather_data.csv"
 OUTPUT_DIR = "outputs"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+CACHE_DIR = os.path.join(OUTPUT_DIR, "cache")
+# Also compare a SHA-1 of the source, not just its mtime and size
+CACHE_CHECK_HASH = False
+# Batch mode (--batch DIR) writes one folder per station file here
+BATCH_OUTPUT_DIR = os.path.join(OUTPUT_DIR, "stations")
+
+WEATHER_COLUMNS = ['Date', 'Temperature', 'Rainfall', 'Humidity']
+VALUE_COLUMNS = ['Temperature', 'Rainfall', 'Humidity']
+CACHE_VERSION = 1
+
+# Streaming mode (--stream): read the CSV this many rows at a time and keep
+# only running aggregates, for files larger than memory
+STREAM_CHUNK_ROWS = 1_000_000
+
+# Incremental mode (--incremental): each run reads only the rows appended since
+# the last one, from a byte offset saved in incremental.json together with the
+# running per-period aggregates, INCREMENTAL_BLOCK_BYTES at a time
+INCREMENTAL_BLOCK_BYTES = 64 << 20
+INCREMENTAL_VERSION = 1
+# Bytes just before the saved offset that must be unchanged to resume
+INCREMENTAL_CHECK_BYTES = 4096
+
+# Figures are rendered in up to this many processes; ones whose inputs match
+# the last run (recorded in figures.json) are skipped. Bump FIGURE_VERSION
+# when the plotting code changes so every figure is redrawn once.
+PLOT_WORKERS = os.cpu_count() or 1
+FIGURE_VERSION = 1
+
+# Row figures with more points than this are decimated before drawing: 'minmax'
+# keeps each bucket's lowest and highest point, 'lttb' keeps one point per
+# bucket by largest-triangle-three-buckets. 2000 is about two points per pixel
+# column of a 10-inch, 100 dpi figure. Both are read when the figure jobs are
+# built (--plot-points / --decimation override them).
+PLOT_POINTS = 2000
+DECIMATION = 'minmax'
+DECIMATION_METHODS = ['lttb', 'minmax']
+
+# Rolling analytics (in-memory mode): trailing windows in days, and readings
+# more than ANOMALY_Z standard deviations from the previous ANOMALY_WINDOW
+# days are flagged; the report lists the ANOMALY_REPORT_ROWS largest
+ROLLING_WINDOWS = [7, 30, 365]
+ANOMALY_WINDOW = 30
+ANOMALY_Z = 3.0
+ANOMALY_REPORT_ROWS = 20
+
+# Benchmark mode (--bench): default number of synthetic rows to aggregate
+BENCH_ROWS = 10_000_000
+# --bench-rolling: years of hourly readings
+BENCH_ROLLING_YEARS = 50
+
+# Seasons in alphabetical order, the order the report has always listed them in
+SEASONS = ['Autumn', 'Spring', 'Summer', 'Winter']
+# SEASON_CODES[month] is that month's position in SEASONS (index 0 is unused)
+SEASON_CODES = np.array([-1, 3, 3, 1, 1, 1, 2, 2, 2, 0, 0, 0, 3])
 
 # -----------------------------
 # 1. Load & Clean Data
 # -----------------------------
-df = pd.read_csv(DATA_FILE)
+# The cleaned frame is cached as one .npy file per column, so later runs
+# memory-map it instead of re-parsing the CSV and its dates.
+def source_fingerprint(path, check_hash=False):
+    stat = os.stat(path)
+    fingerprint = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    if check_hash:
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(block)
+        fingerprint['sha1'] = sha1.hexdigest()
+    return fingerprint
+
+
+def read_cache(cache_dir, source, fingerprint):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta != {'version': CACHE_VERSION, 'source': source, 'fingerprint': fingerprint,
+                    'columns': WEATHER_COLUMNS}:
+            return None
+        return pd.DataFrame({col: np.load(os.path.join(cache_dir, col + '.npy'), mmap_mode='r')
+                             for col in WEATHER_COLUMNS})
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(df, cache_dir, source, fingerprint):
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    # Drop the old metadata first: half-written arrays must never look valid
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for col in WEATHER_COLUMNS:
+        np.save(os.path.join(cache_dir, col + '.npy'), df[col].to_numpy())
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'source': source, 'fingerprint': fingerprint,
+                   'columns': WEATHER_COLUMNS}, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def clean_data(df):
+    # Readings as floats even when the file has no rows or a non-numeric
+    # entry (which counts as missing): the cache can only memory-map numbers
+    df = df.assign(**{col: pd.to_numeric(df[col], errors='coerce').astype(float)
+                      for col in VALUE_COLUMNS})
+
+    # Handle missing values
+    df = df.dropna(subset=WEATHER_COLUMNS)
+
+    # Convert Date column to datetime
+    df['Date'] = pd.to_datetime(df['Date'])
+
+    # Keep relevant columns
+    return df[WEATHER_COLUMNS].reset_index(drop=True)
+
+
+def cache_path(data_file, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, os.path.basename(data_file))
+
+
+def load_clean_data(data_file, cache_dir=CACHE_DIR, check_hash=CACHE_CHECK_HASH):
+    start = time.perf_counter()
+    source = os.path.abspath(data_file)
+    cache_dir = cache_path(data_file, cache_dir)
+    fingerprint = source_fingerprint(data_file, check_hash)
+
+    df = read_cache(cache_dir, source, fingerprint)
+    if df is not None:
+        print(f"Loaded {len(df)} rows from cache in {time.perf_counter() - start:.2f}s (warm).")
+        return df
+
+    df = clean_data(pd.read_csv(data_file))
+    write_cache(df, cache_dir, source, fingerprint)
+    print(f"Loaded {len(df)} rows from CSV in {time.perf_counter() - start:.2f}s (cold, cache written).")
+    return df
+
+
+# Streaming mode: aggregate the CSV chunk by chunk, never holding the whole file
+def chunk_partials(chunk, key):
+    # Per-group count, sum, min, max and M2 (sum of squared deviations)
+    grouped = chunk.groupby(key)[VALUE_COLUMNS]
+    count = grouped.count()
+    return pd.concat({
+        'n': count,
+        'sum': grouped.sum(),
+        'min': grouped.min(),
+        'max': grouped.max(),
+        'm2': grouped.var(ddof=0).fillna(0) * count,
+    }, axis=1)
+
+
+def combine_partials(partials, keys=None):
+    # Exact merge of partial aggregates (Chan et al. parallel variance):
+    # M2 = sum(M2_i + n_i * (mean_i - mean)^2). Rows are merged by their
+    # index, or by `keys` (one group key per row) to roll them up further.
+    stacked = pd.concat(partials)
+    if keys is None:
+        keys = stacked.index.to_numpy()
+
+    def grouped(stat):
+        return stacked[stat].groupby(keys, observed=True)
+
+    mean = grouped('sum').transform('sum') / grouped('n').transform('sum')
+    spread = (stacked['sum'] / stacked['n'] - mean) ** 2 * stacked['n']
+    return pd.concat({
+        'n': grouped('n').sum(),
+        'sum': grouped('sum').sum(),
+        'min': grouped('min').min(),
+        'max': grouped('max').max(),
+        'm2': (stacked['m2'] + spread).groupby(keys, observed=True).sum(),
+    }, axis=1)
+
+
+def period_partials(df):
+    # The one grouping pass over the rows: partials per year-month, keyed YYYYMM
+    dates = df['Date'].dt
+    return chunk_partials(df, (dates.year * 100 + dates.month).rename('Period'))
+
+
+def rollup(partials):
+    # Every aggregation level comes from the per-period partials (12 rows a
+    # year) rather than from another groupby over the raw rows
+    periods = partials.index.to_numpy()
+    months = periods % 100
+    return {
+        'Month': partials_to_stats(combine_partials([partials], months), 'Month'),
+        'Year': partials_to_stats(combine_partials([partials], periods // 100), 'Year'),
+        'Season': partials_to_stats(combine_partials([partials], season_of(months)), 'Season'),
+    }
+
+
+def partials_to_stats(partials, index_name):
+    # Same columns as the in-memory groupby: mean temperature and humidity, total rainfall
+    stats = pd.DataFrame({
+        'Temperature': partials['sum']['Temperature'] / partials['n']['Temperature'],
+        'Rainfall': partials['sum']['Rainfall'],
+        'Humidity': partials['sum']['Humidity'] / partials['n']['Humidity'],
+    })
+    stats.index.name = index_name
+    return stats
+
 
-# Handle missing values
-df = df.dropna(subset=['Date', 'Temperature', 'Rainfall', 'Humidity'])
+def partials_to_summary(partials):
+    # describe()-style overall table; quartiles need every row, so they are left out
+    row = partials.iloc[0]
+    n = row['n']
+    return pd.DataFrame({
+        'count': n,
+        'mean': row['sum'] / n,
+        'std': (row['m2'] / (n - 1)) ** 0.5,
+        'min': row['min'],
+        'max': row['max'],
+    }).T
 
-# Convert Date column to datetime
-df['Date'] = pd.to_datetime(df['Date'])
 
-# Keep relevant columns
-df = df[['Date', 'Temperature', 'Rainfall', 'Humidity']]
+def stream_weather_stats(data_file, cleaned_file, chunk_rows=STREAM_CHUNK_ROWS):
+    periods = None
+    first = True
+    for chunk in pd.read_csv(data_file, usecols=WEATHER_COLUMNS, chunksize=chunk_rows):
+        chunk = clean_data(chunk)
+        chunk.to_csv(cleaned_file, mode='w' if first else 'a', header=first, index=False)
+        first = False
+        if chunk.empty:
+            continue
+        parts = period_partials(chunk)
+        periods = parts if periods is None else combine_partials([periods, parts])
+    return periods_to_stats(periods)
+
+
+def periods_to_stats(periods):
+    # Report tables from per-period partials (no quartiles: they need every row)
+    if periods is None:
+        # No data rows yet (e.g. a new file with only its header): empty tables
+        summary = pd.DataFrame(np.nan, index=['count', 'mean', 'std', 'min', 'max'], columns=VALUE_COLUMNS)
+        summary.loc['count'] = 0
+        return (summary, *(pd.DataFrame(columns=VALUE_COLUMNS, dtype=float).rename_axis(name)
+                           for name in ('Month', 'Year', 'Season')))
+    levels = rollup(periods)
+    overall = combine_partials([periods], np.zeros(len(periods), dtype=int))
+    return partials_to_summary(overall), levels['Month'], levels['Year'], levels['Season']
+
+
+# Incremental mode: resume from the byte offset the previous run stopped at
+def tail_digest(f, offset):
+    f.seek(max(0, offset - INCREMENTAL_CHECK_BYTES))
+    return hashlib.sha1(f.read(offset - f.tell())).hexdigest()
+
+
+def read_incremental_state(state_file, data_file, cleaned_file):
+    # The saved state, or None if the source was replaced or rewritten
+    # (not just appended to) or the cleaned output is missing
+    try:
+        with open(state_file) as f:
+            state = json.load(f)
+        if state['version'] != INCREMENTAL_VERSION or state['source'] != os.path.abspath(data_file):
+            return None
+        if os.path.getsize(data_file) < state['offset'] or os.path.getsize(cleaned_file) < state['cleaned_size']:
+            return None
+        with open(data_file, 'rb') as f:
+            if tail_digest(f, state['offset']) != state['tail_sha1']:
+                return None
+    except (OSError, ValueError, KeyError):
+        return None
+    periods = state['periods']
+    if periods is not None:
+        state['periods'] = pd.DataFrame(periods['data'], index=pd.Index(periods['index'], name='Period'),
+                                        columns=pd.MultiIndex.from_tuples(map(tuple, periods['columns'])))
+    return state
+
+
+def write_incremental_state(state_file, state):
+    # periods stays null until the first data row has been ingested
+    periods = state['periods']
+    if periods is not None:
+        periods = periods.to_dict(orient='split')
+    with open(state_file + '.tmp', 'w') as f:
+        json.dump({**state, 'periods': periods}, f)
+    os.replace(state_file + '.tmp', state_file)
+
+
+def ingest_new_rows(data_file, output_dir, block_bytes=INCREMENTAL_BLOCK_BYTES):
+    # Clean and aggregate only the complete lines added since the last run,
+    # append them to the cleaned CSV and return the updated report tables
+    start = time.perf_counter()
+    state_file = os.path.join(output_dir, "incremental.json")
+    cleaned_file = os.path.join(output_dir, "cleaned_weather_data.csv")
+    state = read_incremental_state(state_file, data_file, cleaned_file)
+
+    with open(data_file, 'rb') as f:
+        if state is None:
+            # First run, or the source changed under us: start from scratch
+            header = f.readline()
+            state = {'version': INCREMENTAL_VERSION, 'source': os.path.abspath(data_file),
+                     'header': list(pd.read_csv(io.BytesIO(header), nrows=0).columns),
+                     'offset': f.tell(), 'last_date': None, 'periods': None}
+            pd.DataFrame(columns=WEATHER_COLUMNS).to_csv(cleaned_file, index=False)
+        else:
+            # Drop anything a crashed run appended after its last saved state
+            with open(cleaned_file, 'r+b') as cleaned:
+                cleaned.truncate(state['cleaned_size'])
+        resumed_from = state['offset']
+
+        f.seek(state['offset'])
+        carry = b''
+        for block in iter(lambda: f.read(block_bytes), b''):
+            # Only whole lines; a line still being written waits for the next run
+            block = carry + block
+            cut = block.rfind(b'\n') + 1
+            block, carry = block[:cut], block[cut:]
+            if not block:
+                continue
+            chunk = clean_data(pd.read_csv(io.BytesIO(block), header=None, names=state['header']))
+            chunk.to_csv(cleaned_file, mode='a', header=False, index=False)
+            state['offset'] += len(block)
+            if chunk.empty:
+                continue
+            parts = period_partials(chunk)
+            periods = state['periods']
+            state['periods'] = parts if periods is None else combine_partials([periods, parts])
+            newest = str(chunk['Date'].max())  # ISO timestamps compare as strings
+            state['last_date'] = max(state['last_date'] or newest, newest)
+        state['tail_sha1'] = tail_digest(f, state['offset'])
+
+    state['cleaned_size'] = os.path.getsize(cleaned_file)
+    write_incremental_state(state_file, state)
+    print(f"Ingested {state['offset'] - resumed_from} new bytes (data up to {state['last_date']}) "
+          f"in {time.perf_counter() - start:.2f}s.")
+    return periods_to_stats(state['periods'])
 
-# Save cleaned data
-cleaned_file = os.path.join(OUTPUT_DIR, "cleaned_weather_data.csv")
-df.to_csv(cleaned_file, index=False)
 
 # -----------------------------
 # 2. Statistical Analysis
 # -----------------------------
-# Daily statistics
-daily_stats = df.describe()
-
-# Monthly aggregation
-df['Month'] = df['Date'].dt.month
-monthly_stats = df.groupby('Month').agg({
-    'Temperature': 'mean',
-    'Rainfall': 'sum',
-    'Humidity': 'mean'
-})
-
-# Yearly aggregation
-df['Year'] = df['Date'].dt.year
-yearly_stats = df.groupby('Year').agg({
-    'Temperature': 'mean',
-    'Rainfall': 'sum',
-    'Humidity': 'mean'
-})
-
-# Seasonal mapping
-def get_season(month):
-    if month in [12, 1, 2]:
-        return 'Winter'
-    elif month in [3, 4, 5]:
-        return 'Spring'
-    elif month in [6, 7, 8]:
-        return 'Summer'
-    else:
-        return 'Autumn'
+# Seasonal mapping: a lookup table indexed by month number, so a whole
+# column is mapped in one step instead of one Python call per row
+def season_of(months):
+    return pd.Categorical.from_codes(SEASON_CODES[np.asarray(months)], categories=SEASONS)
+
+
+def compute_stats(df):
+    # Daily statistics
+    daily_stats = df.describe()
+
+    # Monthly, yearly and seasonal aggregation from a single grouping pass
+    levels = rollup(period_partials(df))
+    return daily_stats, levels['Month'], levels['Year'], levels['Season']
+
+
+def benchmark(n=BENCH_ROWS):
+    # Per-row apply plus three groupbys (the old compute_stats) against
+    # the single-pass rollup, on n synthetic rows at minute resolution
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'Date': pd.date_range('2000-01-01', periods=n, freq='min'),
+        'Temperature': rng.normal(20, 5, n).round(1),
+        'Rainfall': rng.exponential(3, n).round(1),
+        'Humidity': rng.integers(30, 91, n).astype(float),
+    })
+    spec = {'Temperature': 'mean', 'Rainfall': 'sum', 'Humidity': 'mean'}
+    lookup = {month: SEASONS[SEASON_CODES[month]] for month in range(1, 13)}
+
+    start = time.perf_counter()
+    months = df['Date'].dt.month
+    df.groupby(months).agg(spec)
+    df.groupby(df['Date'].dt.year).agg(spec)
+    df.groupby(months.apply(lambda month: lookup[month])).agg(spec)
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    season_of(months)
+    column = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rollup(period_partials(df))
+    single = time.perf_counter() - start
+
+    print(f"{n:,} rows")
+    print(f"apply() seasons + three groupbys: {separate:.2f}s")
+    print(f"Season lookup table (column only): {column:.3f}s")
+    print(f"Single-pass rollup: {single:.2f}s  ({separate / single:.1f}x faster)")
+
+
+# Rolling windows: every window sum is a difference of two prefix sums, so
+# each window size costs O(n) however wide it is. Window edges are found by
+# binary search on the (sorted) timestamps, so irregular or sub-daily data
+# gets true calendar windows rather than fixed row counts.
+def prefix_sums(values):
+    # Prefix sums of x and x^2, centred first so the variance doesn't lose
+    # precision to cancellation over long series
+    centre = values.mean() if len(values) else 0.0
+    centred = values - centre
+    zero = np.zeros(1)
+    return centre, np.concatenate([zero, np.cumsum(centred)]), np.concatenate([zero, np.cumsum(centred ** 2)])
+
+
+def window_mean_std(sums, starts, ends):
+    # Mean, sample std and count of values[starts[i]:ends[i]] for every i
+    centre, s1, s2 = sums
+    n = ends - starts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (s1[ends] - s1[starts]) / n
+        var = (s2[ends] - s2[starts] - n * mean ** 2) / (n - 1)
+    return mean + centre, np.sqrt(np.maximum(var, 0)), n
+
+
+def compute_rolling(df, windows=ROLLING_WINDOWS):
+    # Trailing-window mean and std, like df.rolling('7D', on='Date'), for each window
+    times = df['Date'].to_numpy()
+    ends = np.arange(1, len(df) + 1)
+    rolling = {'Date': df['Date'].to_numpy()}
+    for col in VALUE_COLUMNS:
+        sums = prefix_sums(df[col].to_numpy(dtype=float))
+        for days in windows:
+            starts = np.searchsorted(times, times - np.timedelta64(days, 'D'), side='right')
+            mean, std, _ = window_mean_std(sums, starts, ends)
+            rolling[f'{col}_mean_{days}d'] = mean
+            rolling[f'{col}_std_{days}d'] = std
+    return pd.DataFrame(rolling)
+
+
+def find_anomalies(df, days=ANOMALY_WINDOW, z_limit=ANOMALY_Z):
+    # Each reading's z-score against the readings of the previous `days`
+    # days (itself excluded); skipped until the history covers a full window
+    times = df['Date'].to_numpy()
+    window = np.timedelta64(days, 'D')
+    starts = np.searchsorted(times, times - window, side='left')
+    ends = np.searchsorted(times, times, side='left')
+    warm = times - window >= times[0] if len(times) else np.zeros(0, dtype=bool)
+    found = []
+    for col in VALUE_COLUMNS:
+        values = df[col].to_numpy(dtype=float)
+        mean, std, _ = window_mean_std(prefix_sums(values), starts, ends)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (values - mean) / std
+        hits = np.flatnonzero(warm & (std > 0) & (np.abs(z) > z_limit))
+        found.append(pd.DataFrame({'Date': times[hits], 'Column': col, 'Value': values[hits],
+                                   'Mean': mean[hits], 'Std': std[hits], 'Z': z[hits]}))
+    return pd.concat(found, ignore_index=True)
+
+
+def compute_analytics(df):
+    # The analytics stage: rolling windows and anomalies, on rows sorted by date
+    if not df['Date'].is_monotonic_increasing:
+        df = df.sort_values('Date', kind='stable', ignore_index=True)
+    return compute_rolling(df), find_anomalies(df)
+
+
+def benchmark_rolling(years=BENCH_ROLLING_YEARS):
+    # Prefix-sum windows against pandas' rolling() and against slicing each
+    # window out, on `years` of hourly temperatures
+    rng = np.random.default_rng(42)
+    dates = pd.date_range('1970-01-01', periods=int(years * 365.25 * 24), freq='h')
+    df = pd.DataFrame({'Date': dates,
+                       'Temperature': rng.normal(20, 5, len(dates)).round(1),
+                       'Rainfall': rng.exponential(3, len(dates)).round(1),
+                       'Humidity': rng.integers(30, 91, len(dates)).astype(float)})
+    print(f"{len(df):,} hourly rows ({years} years), windows {ROLLING_WINDOWS} days")
+
+    start = time.perf_counter()
+    rolling = compute_rolling(df)
+    kernel = time.perf_counter() - start
+    start = time.perf_counter()
+    anomalies = find_anomalies(df)
+    flagging = time.perf_counter() - start
+
+    start = time.perf_counter()
+    worst = 0.0
+    for col in VALUE_COLUMNS:
+        for days in ROLLING_WINDOWS:
+            window = df.rolling(f'{days}D', on='Date')[col]
+            worst = max(worst,
+                        np.nanmax(np.abs(window.mean().to_numpy() - rolling[f'{col}_mean_{days}d'].to_numpy())),
+                        np.nanmax(np.abs(window.std().to_numpy() - rolling[f'{col}_std_{days}d'].to_numpy())))
+    reference = time.perf_counter() - start
+
+    # Slicing every window is far too slow to finish, so time a sample of rows
+    sample = 2000
+    times, values = df['Date'].to_numpy(), df['Temperature'].to_numpy()
+    start = time.perf_counter()
+    for i in range(len(df) - sample, len(df)):
+        for days in ROLLING_WINDOWS:
+            window = values[np.searchsorted(times, times[i] - np.timedelta64(days, 'D'), side='right'):i + 1]
+            window.mean(), window.std(ddof=1)
+    sliced = (time.perf_counter() - start) / sample * len(df) * len(VALUE_COLUMNS)
+
+    print(f"Prefix-sum rolling mean/std: {kernel:.2f}s")
+    print(f"Anomaly flags ({len(anomalies):,} found): {flagging:.2f}s")
+    print(f"pandas rolling(): {reference:.2f}s  (max difference {worst:.1e})")
+    print(f"Slicing each window: ~{sliced:,.0f}s estimated from {sample:,} rows  "
+          f"({sliced / kernel:,.0f}x slower)")
 
-df['Season'] = df['Month'].apply(get_season)
-seasonal_stats = df.groupby('Season').agg({
-    'Temperature': 'mean',
-    'Rainfall': 'sum',
-    'Humidity': 'mean'
-})
 
 # -----------------------------
 # 3. Visualizations
 # -----------------------------
-# Line chart: Daily temperature trend
-plt.figure(figsize=(10, 5))
-plt.plot(df['Date'], df['Temperature'], color='orange')
-plt.title("Daily Temperature Trend")
-plt.xlabel("Date")
-plt.ylabel("Temperature (°C)")
-plt.grid(True)
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "temperature_trend.png"))
-plt.close()
-
-# Bar chart: Monthly rainfall totals
-plt.figure(figsize=(8, 5))
-plt.bar(monthly_stats.index, monthly_stats['Rainfall'], color='blue')
-plt.title("Monthly Rainfall Totals")
-plt.xlabel("Month")
-plt.ylabel("Rainfall (mm)")
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "monthly_rainfall.png"))
-plt.close()
-
-# Scatter plot: Humidity vs Temperature
-plt.figure(figsize=(8, 5))
-plt.scatter(df['Temperature'], df['Humidity'], color='green', alpha=0.5)
-plt.title("Humidity vs Temperature")
-plt.xlabel("Temperature (°C)")
-plt.ylabel("Humidity (%)")
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "humidity_vs_temperature.png"))
-plt.close()
-
-# Combined plot: Temperature and Rainfall
-fig, ax1 = plt.subplots(figsize=(10, 5))
-
-ax1.plot(df['Date'], df['Temperature'], color='red', label='Temperature (°C)')
-ax1.set_xlabel('Date')
-ax1.set_ylabel('Temperature (°C)', color='red')
-ax1.tick_params(axis='y', labelcolor='red')
-
-ax2 = ax1.twinx()
-ax2.bar(df['Date'], df['Rainfall'], color='blue', alpha=0.3, label='Rainfall (mm)')
-ax2.set_ylabel('Rainfall (mm)', color='blue')
-ax2.tick_params(axis='y', labelcolor='blue')
-
-fig.tight_layout()
-plt.title("Temperature and Rainfall Over Time")
-plt.savefig(os.path.join(OUTPUT_DIR, "temperature_rainfall_combined.png"))
-plt.close()
+# Decimation: each returns the positions of the points to draw, in order.
+# A budget or method of None means the current PLOT_POINTS / DECIMATION.
+def decimation_settings(points=None, method=None):
+    return (PLOT_POINTS if points is None else points,
+            DECIMATION if method is None else method)
+
+
+def bucket_rows(y, buckets):
+    # y split into equal buckets, one per row; the last is padded with NaN
+    size = -(-len(y) // buckets)
+    padded = np.full(size * -(-len(y) // size), np.nan)
+    padded[:len(y)] = y
+    return padded.reshape(-1, size), size
+
+
+def minmax_indices(y, budget):
+    rows, size = bucket_rows(y, budget // 2)
+    starts = np.arange(len(rows)) * size
+    return np.unique(np.concatenate([starts + np.nanargmin(rows, axis=1),
+                                     starts + np.nanargmax(rows, axis=1)]))
+
+
+def lttb_indices(x, y, budget):
+    # Keeps the first and last points, then walks the buckets in between,
+    # taking the point that forms the largest triangle with the previous pick
+    # and the mean of the next bucket
+    x = x - x[0]
+    edges = np.linspace(1, len(y) - 1, budget - 1).astype(np.int64)
+    picks = np.empty(budget, dtype=np.int64)
+    picks[0], picks[-1] = 0, len(y) - 1
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+def decimate(dates, values, budget=None, method=None):
+    budget, method = decimation_settings(budget, method)
+    if len(values) <= budget:
+        return slice(None)
+    values = np.asarray(values, dtype=float)
+    if method == 'lttb':
+        return lttb_indices(np.asarray(dates).view(np.int64).astype(float), values, budget)
+    return minmax_indices(values, budget)
+
+
+def grid_indices(x, y, budget=None, aspect=5 / 8):
+    # Scatter decimation: one point per cell of a budget-wide grid
+    budget = decimation_settings(budget)[0]
+    if len(x) <= budget:
+        return slice(None)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    columns, rows = budget, max(1, int(budget * aspect))
+    cx = ((x - x.min()) / (np.ptp(x) or 1) * (columns - 1)).astype(np.int64)
+    cy = ((y - y.min()) / (np.ptp(y) or 1) * (rows - 1)).astype(np.int64)
+    return np.sort(np.unique(cx * rows + cy, return_index=True)[1])
+
+
+def bucket_peaks(dates, values, budget=None):
+    # Bar decimation: the tallest bar in each bucket, widened to span it
+    budget = decimation_settings(budget)[0]
+    if len(values) <= budget:
+        return slice(None), 0.8
+    rows, size = bucket_rows(np.asarray(values, dtype=float), budget)
+    picks = np.arange(len(rows)) * size + np.nanargmax(rows, axis=1)
+    span_days = (dates[len(dates) - 1] - dates[0]) / np.timedelta64(1, 'D')
+    return picks, 0.8 * span_days / len(rows)
+
+
+# Each figure is its own function of (data, path), where data holds just the
+# columns it plots: a DataFrame, or a dict of memory-mapped arrays when it
+# runs in a worker process. Row figures also take the decimation budget and
+# method their job was built with.
+def plot_temperature_trend(data, path, points=None, method=None):
+    # Line chart: Daily temperature trend
+    dates, temperature = np.asarray(data['Date']), np.asarray(data['Temperature'])
+    keep = decimate(dates, temperature, points, method)
+    plt.figure(figsize=(10, 5))
+    plt.plot(dates[keep], temperature[keep], color='orange')
+    plt.title("Daily Temperature Trend")
+    plt.xlabel("Date")
+    plt.ylabel("Temperature (°C)")
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_monthly_rainfall(monthly_stats, path):
+    # Bar chart: Monthly rainfall totals
+    plt.figure(figsize=(8, 5))
+    plt.bar(monthly_stats.index, monthly_stats['Rainfall'], color='blue')
+    plt.title("Monthly Rainfall Totals")
+    plt.xlabel("Month")
+    plt.ylabel("Rainfall (mm)")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_humidity_vs_temperature(data, path, points=None, method=None):
+    # Scatter plot: Humidity vs Temperature (grid decimation whatever the method)
+    temperature, humidity = np.asarray(data['Temperature']), np.asarray(data['Humidity'])
+    keep = grid_indices(temperature, humidity, points)
+    plt.figure(figsize=(8, 5))
+    plt.scatter(temperature[keep], humidity[keep], color='green', alpha=0.5)
+    plt.title("Humidity vs Temperature")
+    plt.xlabel("Temperature (°C)")
+    plt.ylabel("Humidity (%)")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_temperature_rainfall(data, path, points=None, method=None):
+    # Combined plot: Temperature and Rainfall
+    dates = np.asarray(data['Date'])
+    temperature, rainfall = np.asarray(data['Temperature']), np.asarray(data['Rainfall'])
+    keep = decimate(dates, temperature, points, method)
+    peaks, width = bucket_peaks(dates, rainfall, points)
+    fig, ax1 = plt.subplots(figsize=(10, 5))
+
+    ax1.plot(dates[keep], temperature[keep], color='red', label='Temperature (°C)')
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Temperature (°C)', color='red')
+    ax1.tick_params(axis='y', labelcolor='red')
+
+    ax2 = ax1.twinx()
+    ax2.bar(dates[peaks], rainfall[peaks], width=width, color='blue', alpha=0.3, label='Rainfall (mm)')
+    ax2.set_ylabel('Rainfall (mm)', color='blue')
+    ax2.tick_params(axis='y', labelcolor='blue')
+
+    fig.tight_layout()
+    plt.title("Temperature and Rainfall Over Time")
+    plt.savefig(path)
+    plt.close()
+
+
+# Figures drawn from the cleaned rows: (file name, plot function, columns used)
+ROW_FIGURES = [
+    ('temperature_trend.png', plot_temperature_trend, ['Date', 'Temperature']),
+    ('humidity_vs_temperature.png', plot_humidity_vs_temperature, ['Temperature', 'Humidity']),
+    ('temperature_rainfall_combined.png', plot_temperature_rainfall, ['Date', 'Temperature', 'Rainfall']),
+]
+
+
+def figure_jobs(data_file, monthly_stats, cache_dir=CACHE_DIR, rows=True, points=None, method=None):
+    # Row figures read the cleaned columns from the .npy cache; only the tiny
+    # monthly table is passed by value. Each job is (name, plot, data,
+    # columns, options): options are the plot's extra keyword arguments,
+    # resolved here so worker processes draw with the same settings.
+    jobs = [('monthly_rainfall.png', plot_monthly_rainfall, monthly_stats[['Rainfall']], None, {})]
+    if rows:
+        source = cache_path(data_file, cache_dir)
+        points, method = decimation_settings(points, method)
+        options = {'points': points, 'method': method}
+        jobs += [(name, plot, source, columns, options) for name, plot, columns in ROW_FIGURES]
+    return jobs
+
+
+def figure_key(plot, data, columns, options):
+    # Identifies a figure's inputs: the cache metadata (source fingerprint)
+    # for cached columns, or a hash of the values for an in-memory frame,
+    # plus the decimation settings it is drawn with
+    sha1 = hashlib.sha1(f"{FIGURE_VERSION}:{json.dumps(options, sort_keys=True)}:"
+                        f"{plot.__name__}:{columns}".encode())
+    if isinstance(data, str):
+        with open(os.path.join(data, 'meta.json'), 'rb') as f:
+            sha1.update(f.read())
+    else:
+        sha1.update(pd.util.hash_pandas_object(data).to_numpy().tobytes())
+    return sha1.hexdigest()
+
+
+def render_figure(plot, data, columns, path, options):
+    # Runs in a worker process: memory-map the cached columns it needs
+    if isinstance(data, str):
+        data = {col: np.load(os.path.join(data, col + '.npy'), mmap_mode='r') for col in columns}
+    plot(data, path, **options)
+
+
+def render_figures(jobs, output_dir, workers=PLOT_WORKERS):
+    start = time.perf_counter()
+    manifest_path = os.path.join(output_dir, 'figures.json')
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    pending = []
+    for name, plot, data, columns, options in jobs:
+        path = os.path.join(output_dir, name)
+        key = figure_key(plot, data, columns, options)
+        if manifest.get(name) != key or not os.path.exists(path):
+            manifest.pop(name, None)
+            pending.append((name, key, (plot, data, columns, path, options)))
+
+    # Every figure is waited for; a failure is collected rather than raised
+    # so the figures after it are still recorded in the manifest
+    failures = []
+    try:
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                futures = [(name, key, pool.submit(render_figure, *args)) for name, key, args in pending]
+                for name, key, future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failures.append((name, e))
+                    else:
+                        manifest[name] = key
+        else:
+            for name, key, args in pending:
+                try:
+                    render_figure(*args)
+                except Exception as e:
+                    failures.append((name, e))
+                else:
+                    manifest[name] = key
+    finally:
+        # Record whatever did render, even if another figure failed
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    print(f"Rendered {len(pending) - len(failures)} of {len(jobs)} figures in "
+          f"{time.perf_counter() - start:.2f}s ({len(jobs) - len(pending)} unchanged).")
+    if failures:
+        raise RuntimeError(f"{len(failures)} figure(s) failed: "
+                           + "; ".join(f"{name}: {e}" for name, e in failures)) from failures[0][1]
+
 
 # -----------------------------
 # 4. Generate Summary Report
 # -----------------------------
-report_file = os.path.join(OUTPUT_DIR, "report.txt")
-with open(report_file, 'w') as f:
-    f.write("Weather Data Visualizer Report\n")
-    f.write("============================\n\n")
-    
-    f.write("Daily Statistics:\n")
-    f.write(daily_stats.to_string())
-    f.write("\n\nMonthly Statistics:\n")
-    f.write(monthly_stats.to_string())
-    f.write("\n\nYearly Statistics:\n")
-    f.write(yearly_stats.to_string())
-    f.write("\n\nSeasonal Statistics:\n")
-    f.write(seasonal_stats.to_string())
-
-print(f"All outputs saved in '{OUTPUT_DIR}' folder.")
+def write_report(daily_stats, monthly_stats, yearly_stats, seasonal_stats, output_dir=OUTPUT_DIR,
+                 analytics=None):
+    report_file = os.path.join(output_dir, "report.txt")
+    with open(report_file, 'w') as f:
+        f.write("Weather Data Visualizer Report\n")
+        f.write("============================\n\n")
+
+        f.write("Daily Statistics:\n")
+        f.write(daily_stats.to_string())
+        f.write("\n\nMonthly Statistics:\n")
+        f.write(monthly_stats.to_string())
+        f.write("\n\nYearly Statistics:\n")
+        f.write(yearly_stats.to_string())
+        f.write("\n\nSeasonal Statistics:\n")
+        f.write(seasonal_stats.to_string())
+        if analytics is not None:
+            write_analytics(f, *analytics)
+
+
+def write_analytics(f, rolling, anomalies):
+    # Latest value of each rolling window, then the largest anomalies; a
+    # file without rows has neither
+    if rolling.empty:
+        f.write("\n\nRolling Statistics and Anomalies: no readings.\n")
+        return
+    latest = rolling.iloc[-1]
+    table = pd.DataFrame({
+        (col, stat): [latest[f'{col}_{stat}_{days}d'] for days in ROLLING_WINDOWS]
+        for col in VALUE_COLUMNS for stat in ('mean', 'std')
+    }, index=pd.Index([f'{days}d' for days in ROLLING_WINDOWS], name='Window'))
+    f.write(f"\n\nRolling Statistics (as of {latest['Date']}):\n")
+    f.write(table.to_string())
+
+    f.write(f"\n\nAnomalies (|z| > {ANOMALY_Z:g} against the previous {ANOMALY_WINDOW} days):\n")
+    counts = anomalies['Column'].value_counts().reindex(VALUE_COLUMNS, fill_value=0)
+    f.write(", ".join(f"{col}: {count}" for col, count in counts.items()))
+    if not anomalies.empty:
+        top = anomalies.reindex(anomalies['Z'].abs().sort_values(ascending=False).index)
+        f.write(f"\nLargest {min(len(top), ANOMALY_REPORT_ROWS)} (all in anomalies.csv):\n")
+        f.write(top.head(ANOMALY_REPORT_ROWS).to_string(index=False))
+    f.write("\n")
+
+
+def station_summary(daily_stats, monthly_stats, yearly_stats, seasonal_stats):
+    # One row of the cross-station summary; a station without rows yet has
+    # no wettest month or warmest season
+    if monthly_stats.empty:
+        wettest_month = warmest_season = None
+    else:
+        wettest_month = int(monthly_stats['Rainfall'].idxmax())
+        warmest_season = seasonal_stats['Temperature'].idxmax()
+    return {
+        'rows': int(daily_stats.loc['count', 'Temperature']),
+        'mean_temperature': daily_stats.loc['mean', 'Temperature'],
+        'min_temperature': daily_stats.loc['min', 'Temperature'],
+        'max_temperature': daily_stats.loc['max', 'Temperature'],
+        'total_rainfall': yearly_stats['Rainfall'].sum(),
+        'mean_humidity': daily_stats.loc['mean', 'Humidity'],
+        'wettest_month': wettest_month,
+        'warmest_season': warmest_season,
+    }
+
+
+# -----------------------------
+# 5. Pipeline
+# -----------------------------
+def run_station(data_file, output_dir=OUTPUT_DIR, stream=False, plot_workers=PLOT_WORKERS,
+                incremental=False, plot_points=None, decimation=None):
+    # Load, clean, aggregate, plot and report one station file into
+    # output_dir (cache included); returns its summary row
+    os.makedirs(output_dir, exist_ok=True)
+    cache_dir = os.path.join(output_dir, "cache")
+    cleaned_file = os.path.join(output_dir, "cleaned_weather_data.csv")
+
+    # Per-row charts need every row, so the streaming and incremental
+    # modes only draw the monthly chart
+    analytics = None
+    if incremental:
+        stats = ingest_new_rows(data_file, output_dir)
+    elif stream:
+        stats = stream_weather_stats(data_file, cleaned_file)
+    else:
+        df = load_clean_data(data_file, cache_dir)
+        df.to_csv(cleaned_file, index=False)
+        stats = compute_stats(df)
+        analytics = compute_analytics(df)
+        analytics[1].to_csv(os.path.join(output_dir, "anomalies.csv"), index=False)
+    rows = not (stream or incremental)
+    render_figures(figure_jobs(data_file, stats[1], cache_dir, rows, plot_points, decimation),
+                   output_dir, plot_workers)
+
+    write_report(*stats, output_dir=output_dir, analytics=analytics)
+    summary = station_summary(*stats)
+    if analytics is not None:
+        summary['anomalies'] = len(analytics[1])
+    return summary
+
+
+def station_name(data_file):
+    return os.path.splitext(os.path.basename(data_file))[0]
+
+
+def run_station_quietly(data_file, output_dir, stream, incremental, plot_points=None, decimation=None):
+    # Batch worker: returns (summary, error) instead of raising, so one bad
+    # station can't stop the batch; figures render serially inside the worker
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = run_station(data_file, output_dir, stream, 1, incremental, plot_points, decimation)
+            error = None
+    except Exception as e:
+        summary, error = {}, f"{type(e).__name__}: {e}"
+    return summary, error, time.perf_counter() - start
+
+
+def run_batch(data_dir, output_root=BATCH_OUTPUT_DIR, workers=None, stream=False, incremental=False,
+              plot_points=None, decimation=None):
+    start = time.perf_counter()
+    files = sorted(glob.glob(os.path.join(data_dir, "*.csv")))
+    if not files:
+        print(f"No CSV files found in {data_dir}")
+        return None
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_station_quietly, data_file, os.path.join(output_root, station_name(data_file)),
+                               stream, incremental, plot_points, decimation): data_file
+                   for data_file in files}
+        for future in as_completed(futures):
+            station = station_name(futures[future])
+            try:
+                summary, error, seconds = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. out of memory)
+                summary, error, seconds = {}, f"{type(e).__name__}: {e}", float('nan')
+            rows.append({'station': station, 'status': 'failed' if error else 'ok',
+                         'seconds': round(seconds, 3), **summary, 'error': error or ''})
+            print(f"{station:24} {'FAILED' if error else 'ok':6} {seconds:7.2f}s  {error or ''}")
+
+    summary = pd.DataFrame(rows).sort_values('station').set_index('station')
+    os.makedirs(output_root, exist_ok=True)
+    summary.to_csv(os.path.join(output_root, "stations_summary.csv"))
+
+    failed = int((summary['status'] == 'failed').sum())
+    print(f"\nProcessed {len(files) - failed} of {len(files)} station(s) in "
+          f"{time.perf_counter() - start:.2f}s ({summary['seconds'].sum():.2f}s of station time).")
+    ok = summary[summary['status'] == 'ok']
+    if not ok.empty:
+        # Failed stations leave gaps, so restore the integer columns for the
+        # rest (nullable: a station without rows yet has no wettest month)
+        ok = ok.astype({'rows': int, 'wettest_month': 'Int64'})
+        print("\nCross-station summary:")
+        print(ok.drop(columns=['status', 'error']).to_string())
+        if ok['mean_temperature'].notna().any():
+            print(f"\nWarmest station: {ok['mean_temperature'].idxmax()}, "
+                  f"wettest station: {ok['total_rainfall'].idxmax()}")
+    print(f"Summary written to {os.path.join(output_root, 'stations_summary.csv')}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weather Data Visualizer")
+    parser.add_argument("--data", default=DATA_FILE, help=f"station CSV to analyse (default: {DATA_FILE})")
+    parser.add_argument("--out", help=f"output folder (default: {OUTPUT_DIR}, or {BATCH_OUTPUT_DIR} for --batch)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stream", action="store_true",
+                      help="aggregate the CSV in chunks instead of loading it whole")
+    mode.add_argument("--incremental", action="store_true",
+                      help="only process rows appended since the last --incremental run")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="process every station CSV in DIR, one output folder each")
+    parser.add_argument("--workers", type=int, help="worker processes for --batch (default: all cores)")
+    parser.add_argument("--plot-points", type=int, default=PLOT_POINTS, metavar="N",
+                        help=f"decimate row figures to about N points (default: {PLOT_POINTS})")
+    parser.add_argument("--decimation", choices=DECIMATION_METHODS, default=DECIMATION,
+                        help=f"decimation for the line charts (default: {DECIMATION})")
+    parser.add_argument("--bench", type=int, nargs="?", const=BENCH_ROWS, metavar="N",
+                        help=f"time the aggregation on N synthetic rows (default: {BENCH_ROWS:,})")
+    parser.add_argument("--bench-rolling", type=int, nargs="?", const=BENCH_ROLLING_YEARS, metavar="YEARS",
+                        help=f"time the rolling windows on YEARS of hourly rows (default: {BENCH_ROLLING_YEARS})")
+    args = parser.parse_args()
+    if args.plot_points < 4:
+        parser.error("--plot-points must be at least 4")
+
+    if args.bench is not None:
+        benchmark(args.bench)
+    elif args.bench_rolling is not None:
+        benchmark_rolling(args.bench_rolling)
+    elif args.batch:
+        run_batch(args.batch, args.out or BATCH_OUTPUT_DIR, args.workers, args.stream, args.incremental,
+                  args.plot_points, args.decimation)
+    else:
+        output_dir = args.out or OUTPUT_DIR
+        run_station(args.data, output_dir, args.stream, incremental=args.incremental,
+                    plot_points=args.plot_points, decimation=args.decimation)
+        print(f"All outputs saved in '{output_dir}' folder.")
+
+
+if __name__ == '__main__':
+    main()